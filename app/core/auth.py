@@ -1,3 +1,7 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
@@ -6,6 +10,7 @@ from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app.models.user_model import User
+from app.core.cache import user_cache
 
 import bcrypt
 
@@ -14,30 +19,74 @@ SECRET_KEY = "your_secret_key_here" # Use a secure secret in production
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
+# Password hashing: bcrypt is slow on purpose (~250 ms at cost 12), so it runs on
+# its own small pool instead of the threadpool that serves every sync endpoint.
+# Callers wait for at most PASSWORD_MAX_CONCURRENCY slots; beyond that they get
+# a 429 right away, so a login storm can't tie up the threads campaign browsing needs.
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+PASSWORD_MAX_CONCURRENCY = int(os.getenv("PASSWORD_MAX_CONCURRENCY", "8"))
+
+_password_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt")
+_password_slots = threading.BoundedSemaphore(PASSWORD_MAX_CONCURRENCY)
+
 # We use direct bcrypt instead of passlib to avoid compatibility issues with bcrypt 5.0+
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="users/login")
 
-def verify_password(plain_password: str, hashed_password: str):
+def _acquire_password_slot():
+    if not _password_slots.acquire(blocking=False):
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many password requests in progress, please retry shortly",
+            headers={"Retry-After": "1"},
+        )
+
+def _run_password_work(fn, *args):
+    """ Runs bcrypt work on the dedicated pool, or rejects with 429 when it is saturated """
+    _acquire_password_slot()
+    try:
+        return _password_executor.submit(fn, *args).result()
+    finally:
+        _password_slots.release()
+
+async def _run_password_work_async(fn, *args):
+    """ Same as _run_password_work, but awaits the pool instead of parking a threadpool thread on it """
+    _acquire_password_slot()
+    try:
+        return await asyncio.wrap_future(_password_executor.submit(fn, *args))
+    finally:
+        _password_slots.release()
+
+def _truncate_password(password: str) -> bytes:
+    # Bcrypt has a 72-byte limit. Newer versions (4.0+) throw ValueError if exceeded.
+    # We encode and truncate to 72 bytes to ensure compatibility.
+    pw_bytes = password.encode('utf-8')
+    if len(pw_bytes) > 72:
+        pw_bytes = pw_bytes[:72]
+    return pw_bytes
+
+def _check_password(plain_password: str, hashed_password: str):
     try:
-        # Bcrypt has a 72-byte limit. Newer versions (4.0+) throw ValueError if exceeded.
-        # We encode and truncate to 72 bytes to ensure compatibility.
-        pw_bytes = plain_password.encode('utf-8')
-        if len(pw_bytes) > 72:
-            pw_bytes = pw_bytes[:72]
-            
-        return bcrypt.checkpw(pw_bytes, hashed_password.encode('utf-8'))
+        return bcrypt.checkpw(_truncate_password(plain_password), hashed_password.encode('utf-8'))
     except Exception as e:
         print(f"Error verifying password: {e}")
         return False
 
+def _hash_password(password: str):
+    salt = bcrypt.gensalt(rounds=BCRYPT_ROUNDS)
+    return bcrypt.hashpw(_truncate_password(password), salt).decode('utf-8')
+
+def verify_password(plain_password: str, hashed_password: str):
+    return _run_password_work(_check_password, plain_password, hashed_password)
+
 def get_password_hash(password: str):
-    # Truncate to 72 bytes for hashing too
-    pw_bytes = password.encode('utf-8')
-    if len(pw_bytes) > 72:
-        pw_bytes = pw_bytes[:72]
-        
-    salt = bcrypt.gensalt()
-    return bcrypt.hashpw(pw_bytes, salt).decode('utf-8')
+    return _run_password_work(_hash_password, password)
+
+async def verify_password_async(plain_password: str, hashed_password: str):
+    return await _run_password_work_async(_check_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str):
+    return await _run_password_work_async(_hash_password, password)
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy() 
@@ -58,13 +107,25 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         phone_number: str = payload.get("sub")
-        if phone_number is None:
+        user_id = payload.get("user_id")
+        if phone_number is None and user_id is None:
             raise credentials_exception
     except JWTError:
         raise credentials_exception
-    
-    # Ensure phone_number is treated as the correct type
-    user = db.query(User).filter(User.phone_number == phone_number).first()
+
+    if user_id is not None:
+        # Hot path: the token names the user, so a cache hit skips the users table
+        user = user_cache.get(user_id)
+        if user is not None:
+            return user
+        user = db.query(User).filter(User.user_id == user_id).first()
+    else:
+        # Tokens issued before the user_id claim existed
+        user = db.query(User).filter(User.phone_number == phone_number).first()
     if user is None:
         raise credentials_exception
+
+    # Detach so the cached object can outlive this request's session
+    db.expunge(user)
+    user_cache.set(user.user_id, user)
     return user
@@ -0,0 +1,140 @@
+"""
+Row readers for POST /donations/bulk.
+
+Accepts a JSON array (application/json), CSV with a header row (text/csv)
+or one JSON object per line (application/x-ndjson). CSV and NDJSON bodies
+are read incrementally from the request stream, so a large settlement file
+never has to sit in memory as a whole; a JSON array is read whole and is
+capped at BULK_MAX_JSON_BYTES. CSV fields must not contain line
+breaks. A line that isn't UTF-8 or is longer than BULK_MAX_LINE_BYTES is
+reported as a failed row; the rest of the body is still read.
+"""
+import csv
+import json
+import os
+from fastapi import HTTPException, Request
+
+CSV_TYPES = ("text/csv", "application/csv")
+NDJSON_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+BULK_MAX_LINE_BYTES = int(os.getenv("BULK_DONATION_MAX_LINE_BYTES", "65536"))
+# A JSON array has to be parsed whole; larger files should be sent as CSV or NDJSON
+BULK_MAX_JSON_BYTES = int(os.getenv("BULK_DONATION_MAX_JSON_BYTES", str(10 * 1024 * 1024)))
+
+
+def _decode_line(line: bytes):
+    if len(line) > BULK_MAX_LINE_BYTES:
+        return None, f"line longer than {BULK_MAX_LINE_BYTES} bytes"
+    try:
+        return line.decode("utf-8").rstrip("\r"), None
+    except UnicodeDecodeError:
+        return None, "line is not valid UTF-8"
+
+
+async def _stream_lines(request: Request):
+    """ Yields (line, None) per line, or (None, error) for a line that can't be read """
+    buffer = b""
+    # Set while dropping the rest of an overlong line, which was already reported
+    skipping = False
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if skipping:
+                skipping = False
+                continue
+            yield _decode_line(line)
+        if len(buffer) > BULK_MAX_LINE_BYTES:
+            if not skipping:
+                yield None, f"line longer than {BULK_MAX_LINE_BYTES} bytes"
+                skipping = True
+            buffer = b""
+    if buffer and not skipping:
+        yield _decode_line(buffer)
+
+
+async def _read_json_body(request: Request) -> bytes:
+    """ Reads a JSON array body, rejecting it with 413 as soon as it is known to be over the limit """
+    too_large = HTTPException(
+        status_code=413,
+        detail=f"JSON bodies are limited to {BULK_MAX_JSON_BYTES} bytes; send larger files as CSV or NDJSON",
+    )
+    content_length = request.headers.get("content-length")
+    if content_length is not None and content_length.isdigit() and int(content_length) > BULK_MAX_JSON_BYTES:
+        raise too_large
+    # Also enforced while reading, for chunked bodies without a Content-Length
+    body = bytearray()
+    async for chunk in request.stream():
+        body += chunk
+        if len(body) > BULK_MAX_JSON_BYTES:
+            raise too_large
+    return bytes(body)
+
+
+def _clean(row: dict) -> dict:
+    # Empty CSV cells mean "not provided"
+    return {key.strip(): (value if value != "" else None) for key, value in row.items() if key}
+
+
+async def read_rows(request: Request):
+    """ Yields (row_number, raw dict or None if unparseable, parse error) for every row in the body """
+    content_type = request.headers.get("content-type", "application/json").split(";")[0].strip().lower()
+
+    if content_type in CSV_TYPES:
+        header = None
+        number = 0
+        async for line, line_error in _stream_lines(request):
+            if line_error:
+                if header is None:
+                    raise HTTPException(status_code=400, detail=f"Unreadable CSV header: {line_error}")
+                number += 1
+                yield number, None, line_error
+                continue
+            if not line.strip():
+                continue
+            values = next(csv.reader([line]))
+            if header is None:
+                header = [name.strip() for name in values]
+                continue
+            number += 1
+            if len(values) != len(header):
+                yield number, None, f"expected {len(header)} columns, got {len(values)}"
+            else:
+                yield number, _clean(dict(zip(header, values))), None
+
+    elif content_type in NDJSON_TYPES:
+        number = 0
+        async for line, line_error in _stream_lines(request):
+            if line_error:
+                number += 1
+                yield number, None, line_error
+                continue
+            if not line.strip():
+                continue
+            number += 1
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError as e:
+                yield number, None, f"invalid JSON: {e.msg}"
+                continue
+            if isinstance(row, dict):
+                yield number, row, None
+            else:
+                yield number, None, "expected a JSON object"
+
+    elif content_type == "application/json":
+        try:
+            rows = json.loads(await _read_json_body(request))
+        except json.JSONDecodeError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid JSON body: {e.msg}")
+        except UnicodeDecodeError:
+            raise HTTPException(status_code=400, detail="Invalid JSON body: not valid UTF-8")
+        if not isinstance(rows, list):
+            raise HTTPException(status_code=400, detail="Expected a JSON array of donations")
+        for number, row in enumerate(rows, start=1):
+            if isinstance(row, dict):
+                yield number, row, None
+            else:
+                yield number, None, "expected a JSON object"
+
+    else:
+        raise HTTPException(status_code=415, detail=f"Unsupported content type '{content_type}'")
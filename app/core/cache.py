@@ -0,0 +1,79 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    Small thread-safe in-process cache with per-entry expiry and LRU eviction.
+    ttl=None keeps entries until they are evicted or invalidated.
+    """
+
+    def __init__(self, ttl: float | None = 60, maxsize: int = 1024):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is not _MISSING:
+                value, expires_at = entry
+                if expires_at is None or expires_at > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key, value):
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, key=_MISSING):
+        """ Drops one key, or everything when called without a key """
+        with self._lock:
+            if key is _MISSING:
+                self._data.clear()
+            else:
+                self._data.pop(key, None)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._data),
+                "ttl_seconds": self.ttl,
+            }
+
+
+# Admin dashboard figures (GET /stats). Invalidated whenever a fundraiser
+# is created, deleted or changes status, and whenever a donation is inserted.
+stats_cache = TTLCache(ttl=float(os.getenv("STATS_CACHE_TTL_SECONDS", "30")), maxsize=1)
+
+# Public home-page figures (GET /platform-stats). Invalidated by
+# PUT /platform-stats and whenever a donation is inserted.
+platform_stats_cache = TTLCache(ttl=float(os.getenv("PLATFORM_STATS_CACHE_TTL_SECONDS", "60")), maxsize=1)
+
+# In-memory LRU front for the upload_digests table (digest -> secure_url).
+# Entries never go stale: the same bytes always map to the same upload.
+upload_digest_cache = TTLCache(ttl=None, maxsize=int(os.getenv("UPLOAD_DIGEST_CACHE_SIZE", "4096")))
+
+# Users resolved from access tokens, keyed by user_id. Invalidated by
+# PUT/DELETE /users/{user_id}; the TTL bounds staleness from other processes.
+user_cache = TTLCache(
+    ttl=float(os.getenv("USER_CACHE_TTL_SECONDS", "60")),
+    maxsize=int(os.getenv("USER_CACHE_SIZE", "10000")),
+)
@@ -0,0 +1,169 @@
+"""
+Response compression for JSON lists and other text payloads.
+
+Pure ASGI middleware: picks brotli when the client accepts it and the
+brotli package is installed, gzip otherwise, and only compresses bodies of
+at least COMPRESSION_MIN_BYTES. Responses that already carry a
+Content-Encoding, bodiless responses (304/204) and non-text media types
+pass through untouched. Streaming bodies (the CSV/NDJSON exports) are
+compressed chunk by chunk.
+
+Every response that could have been compressed (a text media type, or a
+304 revalidating one) carries Vary: Accept-Encoding, whether or not this
+particular one was, so shared caches key on the request's encoding. A
+compressed body is a different representation, so a strong ETag on it is
+weakened (W/"..."); the app's own ETags are weak already (app/core/http_cache.py),
+so a 304 names exactly the ETag the 200 carried.
+"""
+import os
+import zlib
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSION_MIN_BYTES = int(os.getenv("COMPRESSION_MIN_BYTES", "1024"))
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", "4"))  # low quality keeps per-request CPU close to gzip
+
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/x-ndjson", "application/javascript")
+
+
+def _accepted_encodings(accept_encoding: str) -> set:
+    accepted = set()
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        q = params.strip().removeprefix("q=")
+        if name and (not params or q.replace(".", "", 1).isdigit() and float(q) > 0):
+            accepted.add(name.strip())
+    return accepted
+
+
+def choose_encoding(accept_encoding: str) -> str | None:
+    accepted = _accepted_encodings(accept_encoding)
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
+
+class _Encoder:
+
+    def __init__(self, encoding: str):
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=BROTLI_QUALITY)
+            self._zlib = None
+        else:
+            self._brotli = None
+            self._zlib = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)  # wbits=31 -> gzip container
+
+    def compress(self, data: bytes) -> bytes:
+        if self._brotli is not None:
+            return self._brotli.process(data) + self._brotli.flush()
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self._brotli is not None:
+            return self._brotli.finish()
+        return self._zlib.flush()
+
+
+class CompressionMiddleware:
+
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_BYTES):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_headers = dict(scope["headers"])
+        encoding = choose_encoding(request_headers.get(b"accept-encoding", b"").decode("latin-1"))
+
+        start_message = None
+        encoder = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start_message, encoder, passthrough
+            if message["type"] == "http.response.start":
+                headers = {key.lower(): value for key, value in message.get("headers", [])}
+                content_type = headers.get(b"content-type", b"").decode("latin-1")
+                if message["status"] == 304:
+                    passthrough = True
+                    await send(self._vary_start(message))
+                elif (b"content-encoding" in headers or message["status"] == 204
+                        or not content_type.startswith(COMPRESSIBLE_TYPES)):
+                    passthrough = True
+                    await send(message)
+                elif encoding is None:
+                    passthrough = True
+                    await send(self._vary_start(message))
+                else:
+                    start_message = message  # held until the first body chunk decides
+                return
+
+            if passthrough or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if encoder is None:
+                if not more_body and len(body) < self.minimum_size:
+                    passthrough = True
+                    await send(self._vary_start(start_message))
+                    await send(message)
+                    return
+                encoder = _Encoder(encoding)
+                if not more_body:
+                    data = encoder.compress(body) + encoder.finish()
+                    await send(self._compressed_start(start_message, encoding, len(data)))
+                    await send({"type": "http.response.body", "body": data, "more_body": False})
+                    return
+                await send(self._compressed_start(start_message, encoding))
+
+            data = encoder.compress(body)
+            if not more_body:
+                data += encoder.finish()
+            await send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+        await self.app(scope, receive, send_wrapper)
+
+    @staticmethod
+    def _vary_start(message: dict) -> dict:
+        """ Adds Accept-Encoding to the response start's Vary header """
+        headers = []
+        vary = None
+        for key, value in message.get("headers", []):
+            if key.lower() == b"vary":
+                vary = value
+                continue
+            headers.append((key, value))
+        if vary is None:
+            vary = b"Accept-Encoding"
+        elif b"accept-encoding" not in vary.lower():
+            vary += b", Accept-Encoding"
+        headers.append((b"vary", vary))
+        return {**message, "headers": headers}
+
+    @classmethod
+    def _compressed_start(cls, message: dict, encoding: str, length: int | None = None) -> dict:
+        """ Rewrites the held response start for the compressed body (length None = streamed) """
+        headers = []
+        for key, value in cls._vary_start(message)["headers"]:
+            name = key.lower()
+            if name == b"content-length":
+                continue
+            if name == b"etag" and not value.startswith(b"W/"):
+                value = b"W/" + value
+            headers.append((key, value))
+        headers.append((b"content-encoding", encoding.encode("latin-1")))
+        if length is not None:
+            headers.append((b"content-length", str(length).encode("latin-1")))
+        return {**message, "headers": headers}
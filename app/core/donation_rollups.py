@@ -0,0 +1,116 @@
+"""
+Time-bucketed donation rollups behind GET /stats/donations/timeseries.
+
+Every donation adds to one row per granularity (day, week, month) in
+donation_rollups, keyed by bucket, fundraiser and payment method, so
+dashboard charts read a few hundred pre-aggregated rows instead of scanning
+donations. Like the running totals, the helpers only add statements to the
+caller's session and leave committing to the caller.
+
+Donations without a fundraiser_id are not rolled up.
+"""
+from datetime import date, datetime, timedelta
+from sqlalchemy.orm import Session
+from app.models.donation_model import Donations
+from app.models.donation_rollup_model import DonationRollup
+from app.core.donation_totals import upsert_increment
+
+GRANULARITIES = ("day", "week", "month")
+UNKNOWN_PAYMENT_METHOD = "unknown"
+
+
+def bucket_start(when: datetime | date, granularity: str) -> date:
+    """ First day of the bucket containing `when` """
+    day = when.date() if isinstance(when, datetime) else when
+    if granularity == "day":
+        return day
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    if granularity == "month":
+        return day.replace(day=1)
+    raise ValueError(f"Unknown granularity '{granularity}'")
+
+
+def add_to_rollups(buckets: dict, fundraiser_id: int | None, payment_method: str | None,
+                   when: datetime, amount: float, count: int = 1):
+    """ Accumulates one donation (or a pre-summed group) into an in-memory {key: [count, amount]} dict """
+    if fundraiser_id is None:
+        return
+    method = payment_method or UNKNOWN_PAYMENT_METHOD
+    for granularity in GRANULARITIES:
+        key = (granularity, bucket_start(when, granularity), fundraiser_id, method)
+        totals = buckets.setdefault(key, [0, 0.0])
+        totals[0] += count
+        totals[1] += amount or 0
+
+
+def _bump(db: Session, key: tuple, count: int, amount: float):
+    granularity, start, fundraiser_id, method = key
+    match = (
+        (DonationRollup.granularity == granularity)
+        & (DonationRollup.bucket_start == start)
+        & (DonationRollup.fundraiser_id == fundraiser_id)
+        & (DonationRollup.payment_method == method)
+    )
+    values = {
+        DonationRollup.donation_count: DonationRollup.donation_count + count,
+        DonationRollup.amount: DonationRollup.amount + amount,
+    }
+    new_row = dict(granularity=granularity, bucket_start=start, fundraiser_id=fundraiser_id,
+                   payment_method=method, donation_count=count, amount=amount)
+    upsert_increment(db, DonationRollup, match, values, new_row)
+
+
+def apply_rollups(db: Session, buckets: dict):
+    """ Writes accumulated buckets: one UPDATE (or INSERT) per touched rollup row """
+    for key in sorted(buckets):  # fixed order keeps concurrent batches from deadlocking
+        count, amount = buckets[key]
+        _bump(db, key, count, amount)
+
+
+def record_donation_rollups(db: Session, donation: Donations):
+    """ Applies a single, already flushed donation to the rollups """
+    buckets = {}
+    add_to_rollups(buckets, donation.fundraiser_id, donation.payment_method,
+                   donation.donation_date, donation.amount or 0)
+    apply_rollups(db, buckets)
+
+
+def remove_donor_rollups(db: Session, user_id: int, skip_fundraisers=(), batch_size: int = 5000):
+    """
+    Takes a user's donations out of the rollups; call before deleting the user.
+    Rollups of skip_fundraisers cascade away with those fundraisers.
+    """
+    query = (
+        Donations.__table__.select()
+        .with_only_columns(Donations.fundraiser_id, Donations.payment_method, Donations.donation_date, Donations.amount)
+        .where(Donations.user_id == user_id, Donations.fundraiser_id.isnot(None), Donations.donation_date.isnot(None))
+    )
+    if skip_fundraisers:
+        query = query.where(Donations.fundraiser_id.notin_(skip_fundraisers))
+    buckets = {}
+    for fundraiser_id, method, when, amount in db.execute(query.execution_options(yield_per=batch_size)):
+        add_to_rollups(buckets, fundraiser_id, method, when, -(amount or 0), count=-1)
+    apply_rollups(db, buckets)
+
+
+def rebuild_rollups(db: Session, batch_size: int = 5000):
+    """ Recomputes every rollup row from the raw donations table """
+    db.query(DonationRollup).delete(synchronize_session=False)
+    buckets = {}
+    rows = db.execute(
+        Donations.__table__.select()
+        .with_only_columns(Donations.fundraiser_id, Donations.payment_method, Donations.donation_date, Donations.amount)
+        .where(Donations.fundraiser_id.isnot(None), Donations.donation_date.isnot(None))
+        .execution_options(yield_per=batch_size)
+    )
+    for fundraiser_id, method, when, amount in rows:
+        add_to_rollups(buckets, fundraiser_id, method, when, amount or 0)
+
+    db.add_all(
+        DonationRollup(granularity=granularity, bucket_start=start, fundraiser_id=fundraiser_id,
+                       payment_method=method, donation_count=count, amount=amount)
+        for (granularity, start, fundraiser_id, method), (count, amount) in buckets.items()
+    )
+    db.flush()
+    return len(buckets)
@@ -0,0 +1,190 @@
+from datetime import datetime
+from sqlalchemy import case, func, or_, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.models.donation_model import Donations
+from app.models.donation_totals_model import FundraiserTotals, PlatformTotals
+from app.models.platform_stats_model import PlatformStats
+
+PLATFORM_ROW_ID = 1
+
+# The helpers below only add statements to the caller's session.
+# Committing is left to the caller so the totals land in the same
+# transaction as the donations they describe.
+
+def upsert_increment(db: Session, model, match, values: dict, new_row: dict):
+    """
+    Applies the increments in `values` to the row matching `match`, or inserts
+    `new_row` when there is no such row yet. Shared by the totals and the rollups.
+    """
+    if db.query(model).filter(match).update(values, synchronize_session=False):
+        return
+
+    try:
+        # Savepoint so a concurrent first insert doesn't poison the outer transaction
+        with db.begin_nested():
+            db.add(model(**new_row))
+    except IntegrityError:
+        db.query(model).filter(match).update(values, synchronize_session=False)
+
+
+def _increment(db: Session, model, key_column, key, count: int, amount: float, last_at: datetime | None):
+    """ Adds count/amount to one totals row, creating the row on first use """
+    values = {
+        model.donor_count: model.donor_count + count,
+        model.amount_raised: model.amount_raised + amount,
+    }
+    if last_at is not None:
+        values[model.last_donation_at] = case(
+            (model.last_donation_at.is_(None), last_at),
+            (model.last_donation_at < last_at, last_at),
+            else_=model.last_donation_at,
+        )
+    new_row = {key_column.key: key, "donor_count": count, "amount_raised": amount, "last_donation_at": last_at}
+    upsert_increment(db, model, key_column == key, values, new_row)
+
+
+def apply_donation_totals(db: Session, fundraiser_id: int | None, count: int, amount: float, last_at: datetime | None):
+    """ Applies a batch of donations for one fundraiser to the running totals """
+    if fundraiser_id is not None:
+        _increment(db, FundraiserTotals, FundraiserTotals.fundraiser_id, fundraiser_id, count, amount, last_at)
+    _increment(db, PlatformTotals, PlatformTotals.id, PLATFORM_ROW_ID, count, amount, last_at)
+
+
+def apply_batch_totals(db: Session, batch_totals: dict):
+    """
+    Applies {fundraiser_id or None: (count, amount, last_at)} for a whole batch: each fundraiser
+    row in fundraiser_id order, then one summed platform update. Rows are always locked
+    fundraisers first (ascending) then the platform row, like a single donation does, so
+    concurrent batches and donations can't deadlock.
+    """
+    total_count, total_amount, total_last_at = 0, 0.0, None
+    for fundraiser_id in sorted(batch_totals, key=lambda key: (key is None, key or 0)):
+        count, amount, last_at = batch_totals[fundraiser_id]
+        if fundraiser_id is not None:
+            _increment(db, FundraiserTotals, FundraiserTotals.fundraiser_id, fundraiser_id, count, amount, last_at)
+        total_count += count
+        total_amount += amount
+        if last_at is not None and (total_last_at is None or last_at > total_last_at):
+            total_last_at = last_at
+    if total_count:
+        _increment(db, PlatformTotals, PlatformTotals.id, PLATFORM_ROW_ID, total_count, total_amount, total_last_at)
+
+
+def record_donation(db: Session, donation: Donations):
+    """ Applies a single, already flushed donation to the running totals """
+    apply_donation_totals(db, donation.fundraiser_id, 1, donation.amount or 0, donation.donation_date)
+
+
+def remove_fundraiser_totals(db: Session, fundraiser_id: int):
+    """
+    Takes a fundraiser's donations out of the platform totals.
+    Call before deleting the fundraiser; its donations and totals row cascade away with it.
+    """
+    totals = db.query(FundraiserTotals).filter(FundraiserTotals.fundraiser_id == fundraiser_id).first()
+    if not totals:
+        return
+    db.query(PlatformTotals).filter(PlatformTotals.id == PLATFORM_ROW_ID).update(
+        {
+            PlatformTotals.donor_count: PlatformTotals.donor_count - totals.donor_count,
+            PlatformTotals.amount_raised: PlatformTotals.amount_raised - totals.amount_raised,
+        },
+        synchronize_session=False,
+    )
+
+
+def remove_donor_totals(db: Session, user_id: int, skip_fundraisers=()):
+    """
+    Takes a user's donations out of the fundraiser and platform totals.
+    Call before deleting the user; their donations cascade away with them. Donations to
+    skip_fundraisers (the user's own campaigns, removed whole) are left to remove_fundraiser_totals.
+    """
+    query = db.query(
+        Donations.fundraiser_id,
+        func.count(Donations.donation_id),
+        func.coalesce(func.sum(Donations.amount), 0),
+    ).filter(Donations.user_id == user_id)
+    if skip_fundraisers:
+        query = query.filter(or_(Donations.fundraiser_id.is_(None), Donations.fundraiser_id.notin_(skip_fundraisers)))
+    per_fundraiser = query.group_by(Donations.fundraiser_id).all()
+
+    total_count, total_amount = 0, 0
+    # fixed order keeps this from deadlocking with concurrent donations
+    for fundraiser_id, count, amount in sorted(per_fundraiser, key=lambda row: (row[0] is None, row[0] or 0)):
+        total_count += count
+        total_amount += amount
+        if fundraiser_id is None:
+            continue
+        remaining_last_at = select(func.max(Donations.donation_date)).where(
+            Donations.fundraiser_id == fundraiser_id,
+            or_(Donations.user_id.is_(None), Donations.user_id != user_id),
+        ).scalar_subquery()
+        db.query(FundraiserTotals).filter(FundraiserTotals.fundraiser_id == fundraiser_id).update(
+            {
+                FundraiserTotals.donor_count: FundraiserTotals.donor_count - count,
+                FundraiserTotals.amount_raised: FundraiserTotals.amount_raised - amount,
+                FundraiserTotals.last_donation_at: remaining_last_at,
+            },
+            synchronize_session=False,
+        )
+
+    if total_count:
+        db.query(PlatformTotals).filter(PlatformTotals.id == PLATFORM_ROW_ID).update(
+            {
+                PlatformTotals.donor_count: PlatformTotals.donor_count - total_count,
+                PlatformTotals.amount_raised: PlatformTotals.amount_raised - total_amount,
+            },
+            synchronize_session=False,
+        )
+
+
+def get_platform_totals(db: Session):
+    """ Returns the platform-wide totals row (or None before the first donation) """
+    return db.query(PlatformTotals).filter(PlatformTotals.id == PLATFORM_ROW_ID).first()
+
+
+def format_funds_raised(amount: float) -> str:
+    return f"₹{amount:,.0f}"
+
+
+def sync_platform_funds_raised(db: Session):
+    """
+    Copies the running platform total into platform_stats.total_funds_raised.
+    Called from the write path (new donations, rebuilds) so GET /platform-stats never writes.
+    """
+    totals = get_platform_totals(db)
+    formatted_total = format_funds_raised(totals.amount_raised if totals else 0)
+    db.query(PlatformStats).update({PlatformStats.total_funds_raised: formatted_total}, synchronize_session=False)
+    return formatted_total
+
+
+def rebuild_totals(db: Session):
+    """ Recomputes every totals row from the raw donations table """
+    db.query(FundraiserTotals).delete(synchronize_session=False)
+    db.query(PlatformTotals).delete(synchronize_session=False)
+
+    per_fundraiser = (
+        db.query(
+            Donations.fundraiser_id,
+            func.count(Donations.donation_id),
+            func.coalesce(func.sum(Donations.amount), 0),
+            func.max(Donations.donation_date),
+        )
+        .filter(Donations.fundraiser_id.isnot(None))
+        .group_by(Donations.fundraiser_id)
+        .all()
+    )
+    db.add_all(
+        FundraiserTotals(fundraiser_id=fid, donor_count=count, amount_raised=amount, last_donation_at=last_at)
+        for fid, count, amount, last_at in per_fundraiser
+    )
+
+    count, amount, last_at = db.query(
+        func.count(Donations.donation_id),
+        func.coalesce(func.sum(Donations.amount), 0),
+        func.max(Donations.donation_date),
+    ).one()
+    db.add(PlatformTotals(id=PLATFORM_ROW_ID, donor_count=count, amount_raised=amount, last_donation_at=last_at))
+    db.flush()
+    sync_platform_funds_raised(db)
+    return len(per_fundraiser)
@@ -0,0 +1,51 @@
+import hashlib
+import json
+from fastapi import HTTPException, Request
+from app.core.table_versions import table_versions, current_epoch
+
+# Polling clients must revalidate every time; the 304 itself is what's cheap
+LIST_CACHE_CONTROL = "no-cache"
+
+
+# Our ETags name the data, not the bytes: they are weak (W/"...") so the identity,
+# gzip and brotli encodings of a response, and the 304 for any of them, share one tag.
+
+def make_etag(payload) -> str:
+    """ Weak ETag for a JSON-serialisable payload """
+    body = json.dumps(payload, sort_keys=True, default=str, separators=(",", ":"))
+    return 'W/"' + hashlib.sha1(body.encode("utf-8")).hexdigest() + '"'
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    """ True when the client's If-None-Match already names this ETag """
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison, as If-None-Match requires
+    candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return etag.removeprefix("W/") in candidates
+
+
+def version_etag(request: Request, tables: tuple) -> str:
+    """ ETag from the read tables' write versions, the query string and the current epoch """
+    key = f"{request.url.path}?{sorted(request.query_params.multi_items())}|{table_versions.snapshot(tables)}|{current_epoch()}"
+    return 'W/"v-' + hashlib.sha1(key.encode("utf-8")).hexdigest() + '"'
+
+
+def table_etag(*tables: str):
+    """
+    Dependency factory for read endpoints over `tables`. Declare it before the
+    DB session dependency: an unchanged list is answered with 304 before a
+    session or connection is opened. Otherwise returns the caching headers
+    for the endpoint to attach to its response.
+    """
+    def check(request: Request) -> dict:
+        etag = version_etag(request, tables)
+        headers = {"ETag": etag, "Cache-Control": LIST_CACHE_CONTROL}
+        if is_not_modified(request, etag):
+            raise HTTPException(status_code=304, headers=headers)
+        return headers
+
+    return check
@@ -0,0 +1,137 @@
+"""
+Pre-upload image preprocessing.
+
+Phone photos arrive at full resolution with EXIF (including GPS) attached.
+Before a document is uploaded it is decoded, rotated per its EXIF
+orientation and stripped of metadata. The campaign card image is then shrunk
+to IMAGE_MAX_DIMENSION and re-encoded as WebP/JPEG at IMAGE_QUALITY. ID proofs
+and medical/hospital reports have to stay legible for the admins who verify
+them, so they are only capped at DOCUMENT_MAX_DIMENSION and re-encoded
+losslessly (WebP, or PNG when IMAGE_FORMAT is JPEG). The work runs in a
+process pool so decoding large images doesn't hold the GIL on the API process.
+Non-image documents (e.g. PDF reports) pass through untouched, as does
+everything when Pillow isn't installed.
+"""
+import asyncio
+import importlib.util
+import logging
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+# Pillow is optional (without it images are uploaded as sent) and is only
+# imported inside the worker, keeping it off the API's import path.
+PILLOW_AVAILABLE = importlib.util.find_spec("PIL") is not None
+
+logger = logging.getLogger(__name__)
+
+IMAGE_PREPROCESS_ENABLED = os.getenv("IMAGE_PREPROCESS_ENABLED", "true").lower() == "true"
+IMAGE_MAX_DIMENSION = int(os.getenv("IMAGE_MAX_DIMENSION", "1600"))
+IMAGE_FORMAT = os.getenv("IMAGE_FORMAT", "WEBP").upper()  # WEBP or JPEG
+IMAGE_QUALITY = int(os.getenv("IMAGE_QUALITY", "80"))
+IMAGE_PREPROCESS_WORKERS = int(os.getenv("IMAGE_PREPROCESS_WORKERS", "2"))
+DOCUMENT_MAX_DIMENSION = int(os.getenv("DOCUMENT_MAX_DIMENSION", "4096"))
+DOCUMENT_IMAGE_FORMAT = "PNG" if IMAGE_FORMAT == "JPEG" else "WEBP"
+
+# Only shown on campaign cards, so these may be resized and compressed lossily
+DISPLAY_IMAGE_FIELDS = ("campaign_image_url",)
+
+
+class PreprocessStats:
+    """ Running totals of what preprocessing saved; only touched from the event loop """
+
+    def __init__(self):
+        self.images = 0
+        self.skipped = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def snapshot(self):
+        return {
+            "images": self.images,
+            "skipped": self.skipped,
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+        }
+
+
+preprocess_stats = PreprocessStats()
+_pool = None
+
+
+def shrink_image(path: str, max_dimension: int, image_format: str, quality: int, lossless: bool = False) -> str | None:
+    """
+    Runs in a worker process. Writes a resized, metadata-free copy of the image
+    next to the original and returns its path, or None when the file isn't an
+    image. The copy is used even when it isn't smaller: uploading the original
+    would publish its EXIF/GPS data.
+    """
+    from PIL import Image, ImageOps, UnidentifiedImageError
+
+    out_path = None
+    try:
+        with Image.open(path) as img:
+            img = ImageOps.exif_transpose(img)
+            img.thumbnail((max_dimension, max_dimension))
+            if image_format == "JPEG" and img.mode not in ("RGB", "L"):
+                img = img.convert("RGB")
+            elif img.mode not in ("RGB", "RGBA", "L"):
+                img = img.convert("RGBA")
+
+            # Saving a fresh image without exif= drops all metadata
+            with tempfile.NamedTemporaryFile(dir=os.path.dirname(path), prefix="lifegivers-", delete=False) as out:
+                out_path = out.name
+                if lossless:
+                    img.save(out, format=image_format, lossless=True, optimize=True)
+                else:
+                    img.save(out, format=image_format, quality=quality, optimize=True)
+    except (UnidentifiedImageError, OSError):
+        if out_path is not None:
+            os.remove(out_path)
+        return None
+    except BaseException:
+        if out_path is not None:
+            os.remove(out_path)
+        raise
+    return out_path
+
+
+def _get_pool():
+    global _pool
+    if _pool is None and IMAGE_PREPROCESS_WORKERS > 0:
+        try:
+            # spawn: forking a process that already runs threads is unsafe
+            _pool = ProcessPoolExecutor(max_workers=IMAGE_PREPROCESS_WORKERS,
+                                        mp_context=multiprocessing.get_context("spawn"))
+        except (OSError, NotImplementedError) as e:
+            # Some serverless sandboxes can't create process pools
+            logger.warning(f"Image preprocessing process pool unavailable, using a thread: {e}")
+    return _pool
+
+
+async def preprocess_image(path: str, field: str) -> str | None:
+    """
+    Returns the path of a re-encoded, metadata-free copy of the image, or None to upload the original.
+    field is the document's fundraiser_master column; it picks the display or the document settings.
+    """
+    if not IMAGE_PREPROCESS_ENABLED or not PILLOW_AVAILABLE:
+        return None
+
+    if field in DISPLAY_IMAGE_FIELDS:
+        args = (path, IMAGE_MAX_DIMENSION, IMAGE_FORMAT, IMAGE_QUALITY)
+    else:
+        args = (path, DOCUMENT_MAX_DIMENSION, DOCUMENT_IMAGE_FORMAT, IMAGE_QUALITY, True)
+    pool = _get_pool()
+    if pool is not None:
+        processed = await asyncio.get_running_loop().run_in_executor(pool, shrink_image, *args)
+    else:
+        processed = await asyncio.to_thread(shrink_image, *args)
+
+    if processed is None:
+        preprocess_stats.skipped += 1
+        return None
+    preprocess_stats.images += 1
+    preprocess_stats.bytes_in += os.path.getsize(path)
+    preprocess_stats.bytes_out += os.path.getsize(processed)
+    return processed
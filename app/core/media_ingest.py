@@ -0,0 +1,196 @@
+"""
+Background media-ingest pipeline for campaign documents.
+
+create_fundraiser saves the campaign straight away with one
+FundraiserDocument row per submitted document (upload_state="pending")
+and queues the spooled files here. A small pool of asyncio workers uploads
+them with retries and exponential backoff, then fills in the matching
+*_url column on fundraiser_master.
+
+The queue lives in the API process and the spool files in its temp
+directory, so a job does not survive a restart or a frozen serverless
+instance. A recovery sweep, run when the workers start and then every
+MEDIA_INGEST_RECOVERY_INTERVAL_SECONDS, marks documents left "pending" or
+"uploading" for longer than MEDIA_INGEST_STALE_SECONDS as "failed" so
+clients can see they need to be uploaded again.
+"""
+import asyncio
+import contextvars
+import logging
+import os
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from app.database import sessionLocal
+from app.core.uploads import upload_document
+from app.models.fundraiser_model import FundraiserMaster
+from app.models.fundraiser_document_model import FundraiserDocument
+
+logger = logging.getLogger(__name__)
+
+MEDIA_INGEST_WORKERS = int(os.getenv("MEDIA_INGEST_WORKERS", "4"))
+MEDIA_INGEST_QUEUE_SIZE = int(os.getenv("MEDIA_INGEST_QUEUE_SIZE", "100"))
+MEDIA_INGEST_MAX_ATTEMPTS = int(os.getenv("MEDIA_INGEST_MAX_ATTEMPTS", "3"))
+MEDIA_INGEST_BACKOFF_SECONDS = float(os.getenv("MEDIA_INGEST_BACKOFF_SECONDS", "1"))
+# Older than any live job can be (queue wait plus every attempt), so other processes' jobs are left alone
+MEDIA_INGEST_STALE_SECONDS = float(os.getenv("MEDIA_INGEST_STALE_SECONDS", "1800"))
+MEDIA_INGEST_RECOVERY_INTERVAL_SECONDS = float(os.getenv("MEDIA_INGEST_RECOVERY_INTERVAL_SECONDS", "300"))
+
+
+@dataclass
+class UploadJob:
+    fundraiser_id: int
+    field: str
+    path: str
+    attempts: int = 0
+
+
+class MediaIngestQueue:
+    """
+    Bounded upload queue drained by background workers.
+    uploader is an async callable taking a spool file path and the document
+    field and returning the document URL; swap it for a local fake in tests.
+    """
+
+    def __init__(self, uploader=upload_document, session_factory=sessionLocal,
+                 workers: int = MEDIA_INGEST_WORKERS, queue_size: int = MEDIA_INGEST_QUEUE_SIZE,
+                 max_attempts: int = MEDIA_INGEST_MAX_ATTEMPTS, backoff_seconds: float = MEDIA_INGEST_BACKOFF_SECONDS,
+                 stale_seconds: float = MEDIA_INGEST_STALE_SECONDS,
+                 recovery_interval: float = MEDIA_INGEST_RECOVERY_INTERVAL_SECONDS):
+        self.uploader = uploader
+        self.session_factory = session_factory
+        self.workers = workers
+        self.queue_size = queue_size
+        self.max_attempts = max_attempts
+        self.backoff_seconds = backoff_seconds
+        self.stale_seconds = stale_seconds
+        self.recovery_interval = recovery_interval
+        self._queue = None
+        self._tasks = []
+        self._loop = None
+
+    def start(self):
+        """ Starts the workers and the recovery sweep on the running loop (app startup) """
+        self._ensure_started()
+
+    def _ensure_started(self):
+        # Workers are started on the running loop by app startup or, failing that, the first enqueue
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        self._loop = loop
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        # Tasks copy the context they are created in; starting them from an empty one keeps
+        # the first enqueuing request's contextvars (e.g. its DB query stats) out of the workers
+        self._tasks = [contextvars.Context().run(loop.create_task, self._worker()) for _ in range(self.workers)]
+        self._tasks.append(contextvars.Context().run(loop.create_task, self._recovery_loop()))
+
+    async def enqueue(self, job: UploadJob):
+        """ Queues a job; waits for a free slot when the queue is full """
+        self._ensure_started()
+        await self._queue.put(job)
+
+    async def join(self):
+        """ Waits until every queued job has finished (used by tests and shutdown) """
+        if self._queue is not None:
+            await self._queue.join()
+
+    def depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def _worker(self):
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._process(job)
+            except Exception as e:
+                logger.error(f"Media ingest worker failed on {job.field} of fundraiser {job.fundraiser_id}: {e}")
+                # Never leave the document "uploading"; if this write fails too the recovery sweep catches it
+                try:
+                    await asyncio.to_thread(self._save_state, job, "failed", job.attempts, error=str(e))
+                except Exception as save_error:
+                    logger.error(f"Could not mark {job.field} of fundraiser {job.fundraiser_id} failed: {save_error}")
+            finally:
+                self._queue.task_done()
+
+    async def _recovery_loop(self):
+        while True:
+            try:
+                recovered = await asyncio.to_thread(self.recover_stale_jobs)
+                if recovered:
+                    logger.warning(f"Marked {recovered} interrupted document uploads as failed")
+            except Exception as e:
+                logger.error(f"Media ingest recovery sweep failed: {e}")
+            await asyncio.sleep(self.recovery_interval)
+
+    def recover_stale_jobs(self) -> int:
+        """
+        Marks documents stuck in "pending"/"uploading" past stale_seconds as "failed".
+        Their spool files went with the process that queued them, so they can't be retried here.
+        """
+        cutoff = datetime.utcnow() - timedelta(seconds=self.stale_seconds)
+        db = self.session_factory()
+        try:
+            recovered = db.query(FundraiserDocument).filter(
+                FundraiserDocument.upload_state.in_(("pending", "uploading")),
+                FundraiserDocument.updated_at < cutoff,
+            ).update(
+                {
+                    FundraiserDocument.upload_state: "failed",
+                    FundraiserDocument.last_error: "Upload interrupted before it finished; please upload the document again",
+                    FundraiserDocument.updated_at: datetime.utcnow(),
+                },
+                synchronize_session=False,
+            )
+            db.commit()
+            return recovered
+        finally:
+            db.close()
+
+    async def _process(self, job: UploadJob):
+        try:
+            for attempt in range(1, self.max_attempts + 1):
+                job.attempts = attempt
+                await asyncio.to_thread(self._save_state, job, "uploading", attempt)
+                try:
+                    url = await self.uploader(job.path, job.field)
+                except Exception as e:
+                    logger.warning(f"Upload of {job.field} for fundraiser {job.fundraiser_id} failed (attempt {attempt}): {e}")
+                    if attempt == self.max_attempts:
+                        await asyncio.to_thread(self._save_state, job, "failed", attempt, error=str(e))
+                        return
+                    await asyncio.sleep(self.backoff_seconds * 2 ** (attempt - 1))
+                else:
+                    await asyncio.to_thread(self._save_state, job, "done", attempt, url=url)
+                    logger.info(f"Uploaded {job.field} for fundraiser {job.fundraiser_id}")
+                    return
+        finally:
+            try:
+                os.remove(job.path)
+            except OSError:
+                pass
+
+    def _save_state(self, job: UploadJob, state: str, attempts: int, error: str | None = None, url: str | None = None):
+        db = self.session_factory()
+        try:
+            db.query(FundraiserDocument).filter(
+                FundraiserDocument.fundraiser_id == job.fundraiser_id,
+                FundraiserDocument.field == job.field,
+            ).update(
+                {
+                    FundraiserDocument.upload_state: state,
+                    FundraiserDocument.attempts: attempts,
+                    FundraiserDocument.last_error: error,
+                    FundraiserDocument.updated_at: datetime.utcnow(),
+                },
+                synchronize_session=False,
+            )
+            if url is not None:
+                db.query(FundraiserMaster).filter(FundraiserMaster.fundraiser_id == job.fundraiser_id).update(
+                    {getattr(FundraiserMaster, job.field): url}, synchronize_session=False
+                )
+            db.commit()
+        finally:
+            db.close()
+
+
+media_ingest = MediaIngestQueue()
@@ -0,0 +1,303 @@
+"""
+In-process metrics exposed in Prometheus text format on GET /metrics.
+
+A deliberately small registry (counters, gauges, histograms with labels) so
+the app doesn't need prometheus_client. Request latency and in-flight counts
+come from RequestMetricsMiddleware; per-request database query counts and
+durations come from SQLAlchemy cursor events (instrument_engine) feeding the
+RequestStats held in a contextvar for the current request. Existing snapshots
+(upload executor, connection pool, caches, ingest queue) are exported through
+collectors evaluated at scrape time.
+
+Values are per process: with several uvicorn workers, scrape each one or
+aggregate them in Prometheus.
+"""
+import bisect
+import contextvars
+import logging
+import os
+import random
+import threading
+import time
+from dataclasses import dataclass
+from sqlalchemy import event
+
+LOG_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", "0.01"))
+LOG_SLOW_REQUEST_MS = float(os.getenv("LOG_SLOW_REQUEST_MS", "1000"))
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+UPLOAD_BUCKETS = (0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+logger = logging.getLogger("app.requests")
+
+
+def _format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labels: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, *labels):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> list[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return self.header() + [
+            f"{self.name}{_format_labels(self.label_names, labels)} {_format_value(value)}" for labels, value in items
+        ]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, amount: float = 1, *labels):
+        self.inc(-amount, *labels)
+
+    def set(self, value: float, *labels):
+        with self._lock:
+            self._values[labels] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labels: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, *labels):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(labels)
+            if series is None:
+                # per-bucket (non-cumulative) counts, then sum and count
+                series = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> list[str]:
+        with self._lock:
+            items = [(labels, (list(counts), total, count)) for labels, (counts, total, count) in self._values.items()]
+        lines = self.header()
+        for labels, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(float(bound))}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.label_names, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.label_names, labels)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.label_names, labels)} {count}")
+        return lines
+
+
+class Registry:
+
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def collector(self, fn):
+        """ Registers fn() -> iterable of (name, kind, help, {labels}, value) read at scrape time """
+        self._collectors.append(fn)
+        return fn
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for collect in self._collectors:
+            try:
+                samples = list(collect())
+            except Exception:
+                logger.exception("Metrics collector %s failed", collect.__name__)
+                continue
+            described = set()
+            for name, kind, documentation, labels, value in samples:
+                if name not in described:
+                    described.add(name)
+                    lines.append(f"# HELP {name} {documentation}")
+                    lines.append(f"# TYPE {name} {kind}")
+                names = tuple(labels)
+                lines.append(f"{name}{_format_labels(names, tuple(labels[n] for n in names))} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+http_requests = registry.register(Counter(
+    "http_requests_total", "HTTP requests by route template, method and status", ("method", "route", "status")))
+http_request_duration = registry.register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template", ("method", "route")))
+http_in_flight = registry.register(Gauge(
+    "http_requests_in_flight", "HTTP requests currently being served"))
+db_queries_per_request = registry.register(Histogram(
+    "http_request_db_queries", "Database statements executed per HTTP request", ("method", "route"),
+    buckets=QUERY_COUNT_BUCKETS))
+db_seconds_per_request = registry.register(Histogram(
+    "http_request_db_seconds", "Time spent in database statements per HTTP request", ("method", "route")))
+db_query_duration = registry.register(Histogram(
+    "db_query_duration_seconds", "Duration of individual database statements"))
+upload_duration = registry.register(Histogram(
+    "upload_duration_seconds", "Cloudinary upload duration by outcome", ("outcome",), buckets=UPLOAD_BUCKETS))
+
+
+@dataclass
+class RequestStats:
+    """ Per-request accumulator; shared by reference with worker threads via the contextvar """
+    query_count: int = 0
+    query_seconds: float = 0.0
+    profile: object = None  # QueryProfile when DB_PROFILE is on (app/core/query_profiler.py)
+
+
+current_request_stats: contextvars.ContextVar[RequestStats | None] = contextvars.ContextVar(
+    "current_request_stats", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+    db_query_duration.observe(elapsed)
+    stats = current_request_stats.get()
+    if stats is not None:
+        stats.query_count += 1
+        stats.query_seconds += elapsed
+        if stats.profile is not None:
+            stats.profile.record(conn, cursor, statement, parameters, executemany, elapsed)
+
+
+def instrument_engine(sync_engine):
+    """ Hooks statement timing into an Engine (for AsyncEngine pass .sync_engine) """
+    if not event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class RequestMetricsMiddleware:
+    """
+    Pure ASGI middleware: times each request (including streamed bodies), tracks
+    in-flight requests and the request's DB statements, and logs a sample of
+    requests plus every slow or failed one. Routes are labelled by their path
+    template (/fundraiser/{fundraiser_id}), never the raw URL.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = current_request_stats.set(stats)
+        status = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                summary = stats.profile.header_value() if stats.profile is not None else None
+                if summary:
+                    message["headers"] = [*message.get("headers", []), (b"x-db-queries", summary.encode())]
+            await send(message)
+
+        http_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            http_in_flight.dec()
+            current_request_stats.reset(token)
+            if stats.profile is not None:
+                stats.profile.report(scope["method"], scope["path"])
+
+            route = scope.get("route")
+            route_name = getattr(route, "path", None) or "unmatched"
+            method = scope["method"]
+            http_requests.inc(1, method, route_name, status)
+            http_request_duration.observe(elapsed, method, route_name)
+            db_queries_per_request.observe(stats.query_count, method, route_name)
+            db_seconds_per_request.observe(stats.query_seconds, method, route_name)
+
+            elapsed_ms = elapsed * 1000
+            if status >= 500 or elapsed_ms >= LOG_SLOW_REQUEST_MS:
+                logger.warning("%s %s -> %s in %.1fms (%d queries, %.1fms db)", method, scope["path"], status,
+                               elapsed_ms, stats.query_count, stats.query_seconds * 1000)
+            elif LOG_SAMPLE_RATE and random.random() < LOG_SAMPLE_RATE:
+                logger.info("%s %s -> %s in %.1fms (%d queries, %.1fms db)", method, scope["path"], status,
+                            elapsed_ms, stats.query_count, stats.query_seconds * 1000)
+
+
+@registry.collector
+def _application_snapshots():
+    """ Re-exports the JSON stats endpoints' snapshots as gauges/counters """
+    from app.core.cache import stats_cache, platform_stats_cache, upload_digest_cache, user_cache
+    from app.core.upload_executor import upload_executor
+    from app.core.media_ingest import media_ingest
+    from app.database import pool_status
+
+    uploads = upload_executor.metrics.snapshot()
+    yield "upload_queue_depth", "gauge", "Uploads waiting for an executor slot", {}, uploads["queue_depth"]
+    yield "upload_in_flight", "gauge", "Uploads currently running", {}, uploads["in_flight"]
+    yield "media_ingest_queue_depth", "gauge", "Documents waiting in the background ingest queue", {}, media_ingest.depth()
+
+    caches = {"stats": stats_cache, "platform_stats": platform_stats_cache,
+              "upload_digest": upload_digest_cache, "user": user_cache}
+    for name, cache in caches.items():
+        cache_stats = cache.stats()
+        yield "cache_hits_total", "counter", "In-process cache hits", {"cache": name}, cache_stats["hits"]
+        yield "cache_misses_total", "counter", "In-process cache misses", {"cache": name}, cache_stats["misses"]
+        yield "cache_entries", "gauge", "Entries currently held by the cache", {"cache": name}, cache_stats["size"]
+
+    pools = pool_status()
+    pools = {"sync": pools, **({"async": pools["async_pool"]} if "async_pool" in pools else {})}
+    for name, pool in pools.items():
+        if "size" not in pool:
+            continue
+        labels = {"pool": name}
+        yield "db_pool_size", "gauge", "Configured pool size", labels, pool["size"]
+        yield "db_pool_checked_out", "gauge", "Connections currently checked out", labels, pool["checked_out"]
+        yield "db_pool_overflow", "gauge", "Overflow connections currently open", labels, pool["overflow"]
+        yield "db_pool_checkouts_total", "counter", "Connection checkouts", labels, pool["checkouts"]
+        yield ("db_pool_checkout_wait_seconds_max", "gauge", "Longest wait for a pooled connection",
+               labels, pool["max_checkout_wait_seconds"])
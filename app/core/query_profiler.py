@@ -0,0 +1,87 @@
+"""
+Opt-in per-request query profiling (DB_PROFILE=true).
+
+get_db / get_async_db attach a QueryProfile to the current request's
+RequestStats (app/core/metrics.py); the engine's cursor hooks then hand it
+every statement the request executes. At the end of the request the profile
+logs statements repeated DB_N_PLUS_ONE_THRESHOLD times or more (the usual N+1
+signature: one query shape, many parameter sets). Statements slower than
+DB_SLOW_QUERY_MS are logged straight away with their EXPLAIN plan. With
+DEBUG=true a per-request summary is returned in an X-DB-Queries header.
+
+Off by default: it keeps every statement of the request in memory and the
+EXPLAIN runs an extra round trip for each slow query.
+"""
+import logging
+import os
+from collections import Counter
+from app.core.metrics import current_request_stats
+
+DB_PROFILE = os.getenv("DB_PROFILE", "false").lower() == "true"
+DB_SLOW_QUERY_MS = float(os.getenv("DB_SLOW_QUERY_MS", "200"))
+DB_N_PLUS_ONE_THRESHOLD = int(os.getenv("DB_N_PLUS_ONE_THRESHOLD", "5"))
+DEBUG = os.getenv("DEBUG", "false").lower() == "true"
+
+logger = logging.getLogger("app.db.profile")
+
+
+class QueryProfile:
+    """ Statements executed during one request, in order, with their timings """
+
+    def __init__(self):
+        self.queries = []
+        self.total_seconds = 0.0
+        self._shapes = Counter()
+
+    def record(self, conn, cursor, statement: str, parameters, executemany: bool, seconds: float):
+        self.queries.append((statement, seconds))
+        self.total_seconds += seconds
+        self._shapes[statement] += 1
+        if seconds * 1000 >= DB_SLOW_QUERY_MS:
+            logger.warning("Slow query (%.1fms): %s\nparameters: %r\nplan:\n%s", seconds * 1000, statement,
+                           parameters, explain(conn, statement, parameters) if not executemany else "(executemany)")
+
+    def repeated(self) -> list[tuple[str, int]]:
+        return [(statement, count) for statement, count in self._shapes.most_common()
+                if count >= DB_N_PLUS_ONE_THRESHOLD]
+
+    def report(self, method: str, path: str):
+        """ Logs N+1 candidates for the finished request """
+        for statement, count in self.repeated():
+            logger.warning("Possible N+1 in %s %s: statement ran %d times: %s", method, path, count, statement)
+
+    def header_value(self) -> str | None:
+        if not DEBUG:
+            return None
+        slowest = max((seconds for _, seconds in self.queries), default=0.0)
+        return (f"count={len(self.queries)}; total_ms={self.total_seconds * 1000:.1f}; "
+                f"slowest_ms={slowest * 1000:.1f}; repeated={len(self.repeated())}")
+
+
+def explain(conn, statement: str, parameters) -> str:
+    """
+    Plan for a statement that just ran, fetched on a raw DBAPI cursor of the
+    same connection so it doesn't show up in the metrics or the profile itself.
+    Only read statements are explained.
+    """
+    if not statement.lstrip().upper().startswith(("SELECT", "WITH")):
+        return "(not a read statement)"
+    prefix = "EXPLAIN QUERY PLAN " if conn.dialect.name == "sqlite" else "EXPLAIN "
+    try:
+        cursor = conn.connection.dbapi_connection.cursor()
+        try:
+            cursor.execute(prefix + statement, parameters)
+            return "\n".join(" ".join(str(column) for column in row) for row in cursor.fetchall())
+        finally:
+            cursor.close()
+    except Exception as e:
+        return f"(EXPLAIN failed: {e})"
+
+
+def attach_profile():
+    """ Starts profiling the current request's statements, if DB_PROFILE is on """
+    if not DB_PROFILE:
+        return
+    stats = current_request_stats.get()
+    if stats is not None and stats.profile is None:
+        stats.profile = QueryProfile()
@@ -0,0 +1,128 @@
+"""
+Full-text campaign search behind GET /fundraiser/search.
+
+PostgreSQL: a tsvector column (fundraiser_master.search_vector) kept current
+by a BEFORE INSERT/UPDATE trigger, with a GIN index, ranked with ts_rank_cd. SQLite: an external-content FTS5 table
+(fundraiser_search) kept in step by triggers, ranked with bm25. Both are created
+by migration 8; the search column is deliberately not on the ORM model, so
+SELECTs of FundraiserMaster never drag the vector along.
+
+Every query term is matched as a prefix ("hosp" finds "hospital"), all terms
+must match, and title hits outrank patient/hospital/location hits, which
+outrank story hits.
+"""
+import re
+from fastapi import HTTPException
+from sqlalchemy import text
+
+SEARCH_COLUMNS = ("campaign_title", "patient_name", "hospital_name", "location", "story_text")
+MAX_QUERY_TERMS = 8
+
+# 'simple' rather than 'english': most searches are for patient, hospital and
+# place names, which stemming and stop-word removal only get wrong.
+POSTGRES_SEARCH_WEIGHTS = (
+    ("campaign_title", "A"),
+    ("patient_name", "B"),
+    ("hospital_name", "B"),
+    ("location", "C"),
+    ("story_text", "D"),
+)
+POSTGRES_SEARCH_TRIGGER = "fundraiser_search_vector_trg"
+POSTGRES_SEARCH_FUNCTION = "fundraiser_search_vector_update"
+
+
+def postgres_search_vector(row: str = "") -> str:
+    """ The search_vector expression; row="NEW." reads the columns inside the trigger """
+    return " || ".join(
+        f"setweight(to_tsvector('simple', coalesce({row}{column}, '')), '{weight}')"
+        for column, weight in POSTGRES_SEARCH_WEIGHTS
+    )
+
+
+def postgres_search_trigger_ddl() -> list[str]:
+    """ Trigger function and trigger that fill search_vector on every insert and text update """
+    columns = ", ".join(SEARCH_COLUMNS)
+    return [
+        f"CREATE OR REPLACE FUNCTION {POSTGRES_SEARCH_FUNCTION}() RETURNS trigger AS $$ BEGIN "
+        f"NEW.search_vector := {postgres_search_vector('NEW.')}; RETURN NEW; END $$ LANGUAGE plpgsql",
+        f"CREATE TRIGGER {POSTGRES_SEARCH_TRIGGER} BEFORE INSERT OR UPDATE OF {columns} ON fundraiser_master "
+        f"FOR EACH ROW EXECUTE FUNCTION {POSTGRES_SEARCH_FUNCTION}()",
+    ]
+
+
+SQLITE_FTS_TABLE = "fundraiser_search"
+# Per-column bm25 weights, in SEARCH_COLUMNS order
+SQLITE_BM25_WEIGHTS = "10.0, 5.0, 5.0, 3.0, 1.0"
+
+_CARD_COLUMNS = (
+    "f.fundraiser_id, f.campaign_title, f.target_amount, f.category, f.location, "
+    "f.campaign_image_url, coalesce(t.amount_raised, 0) AS raised_amount"
+)
+
+_POSTGRES_QUERY = f"""
+SELECT {_CARD_COLUMNS}, ts_rank_cd(f.search_vector, q.query) AS rank
+FROM fundraiser_master f
+CROSS JOIN to_tsquery('simple', :query) AS q(query)
+LEFT JOIN fundraiser_totals t ON t.fundraiser_id = f.fundraiser_id
+WHERE f.search_vector @@ q.query {{status_filter}}
+ORDER BY rank DESC, f.fundraiser_id DESC
+LIMIT :limit OFFSET :offset
+"""
+
+_SQLITE_QUERY = f"""
+SELECT {_CARD_COLUMNS}, -bm25({SQLITE_FTS_TABLE}, {SQLITE_BM25_WEIGHTS}) AS rank
+FROM {SQLITE_FTS_TABLE} s
+JOIN fundraiser_master f ON f.fundraiser_id = s.rowid
+LEFT JOIN fundraiser_totals t ON t.fundraiser_id = f.fundraiser_id
+WHERE {SQLITE_FTS_TABLE} MATCH :query {{status_filter}}
+ORDER BY rank DESC, f.fundraiser_id DESC
+LIMIT :limit OFFSET :offset
+"""
+
+
+def query_terms(q: str) -> list[str]:
+    """ Splits user input into plain word terms; all query syntax is dropped """
+    terms = re.findall(r"\w+", q.lower())[:MAX_QUERY_TERMS]
+    if not terms:
+        raise HTTPException(status_code=400, detail="Search query must contain at least one letter or digit")
+    return terms
+
+
+def build_search(dialect: str, q: str, status: str | None = None):
+    """ Returns (statement, params) for one page of search results on the given dialect """
+    terms = query_terms(q)
+    status_filter = "AND f.status = :status" if status else ""
+    if dialect == "postgresql":
+        sql = _POSTGRES_QUERY.format(status_filter=status_filter)
+        query = " & ".join(f"{term}:*" for term in terms)
+    elif dialect == "sqlite":
+        sql = _SQLITE_QUERY.format(status_filter=status_filter)
+        query = " ".join(f'"{term}"*' for term in terms)
+    else:
+        raise HTTPException(status_code=501, detail=f"Search is not available on {dialect}")
+
+    params = {"query": query}
+    if status:
+        params["status"] = status
+    return text(sql), params
+
+
+def sqlite_search_ddl() -> list[str]:
+    """ FTS5 table, sync triggers and initial build for SQLite """
+    columns = ", ".join(SEARCH_COLUMNS)
+    new_values = ", ".join(f"new.{column}" for column in SEARCH_COLUMNS)
+    old_values = ", ".join(f"old.{column}" for column in SEARCH_COLUMNS)
+    table = SQLITE_FTS_TABLE
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {table} USING fts5("
+        f"{columns}, content='fundraiser_master', content_rowid='fundraiser_id', "
+        f"tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+        f"CREATE TRIGGER IF NOT EXISTS {table}_ai AFTER INSERT ON fundraiser_master BEGIN "
+        f"INSERT INTO {table}(rowid, {columns}) VALUES (new.fundraiser_id, {new_values}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {table}_ad AFTER DELETE ON fundraiser_master BEGIN "
+        f"INSERT INTO {table}({table}, rowid, {columns}) VALUES ('delete', old.fundraiser_id, {old_values}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {table}_au AFTER UPDATE OF {columns} ON fundraiser_master BEGIN "
+        f"INSERT INTO {table}({table}, rowid, {columns}) VALUES ('delete', old.fundraiser_id, {old_values}); "
+        f"INSERT INTO {table}(rowid, {columns}) VALUES (new.fundraiser_id, {new_values}); END",
+        f"INSERT INTO {table}({table}) VALUES ('rebuild')",
+    ]
@@ -0,0 +1,68 @@
+"""
+Fast JSON path for the list and detail endpoints.
+
+Returning ORM objects makes FastAPI walk every attribute through
+jsonable_encoder in pure Python, which dominates CPU time on large lists.
+Endpoints on the hot path instead build plain dicts with the serializers
+below (one attrgetter call per row) and return a FastJSONResponse directly,
+which skips jsonable_encoder entirely and encodes with orjson.
+
+orjson is optional: without it FastJSONResponse falls back to the standard
+library encoder (still without the jsonable_encoder pass).
+"""
+import json
+from datetime import date, datetime
+from operator import attrgetter
+from fastapi.responses import JSONResponse
+from app.models.donation_model import Donations
+from app.models.fundraiser_model import FundraiserMaster
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+ORJSON_AVAILABLE = orjson is not None
+
+
+def json_default(value):
+    """ json.dumps default= for the dates and datetimes in our rows (also used by exports) """
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class FastJSONResponse(JSONResponse):
+    """ JSONResponse rendered with orjson; content must already be plain dicts/lists/scalars """
+
+    def render(self, content) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+        return json.dumps(content, ensure_ascii=False, separators=(",", ":"), default=json_default).encode("utf-8")
+
+
+def _serializer(fields: tuple):
+    getter = attrgetter(*fields)
+
+    def serialize(obj) -> dict:
+        return dict(zip(fields, getter(obj)))
+
+    serialize.fields = fields
+    return serialize
+
+
+def _table_fields(model) -> tuple:
+    return tuple(column.key for column in model.__table__.columns)
+
+
+serialize_fundraiser = _serializer(_table_fields(FundraiserMaster))
+serialize_donation = _serializer(_table_fields(Donations))
+
+# Public user shape (UserResponse); never the password hash
+USER_PUBLIC_FIELDS = ("user_id", "fullname", "phone_number")
+serialize_user = _serializer(USER_PUBLIC_FIELDS)
+
+
+def rows_to_dicts(rows) -> list[dict]:
+    """ Column-only result rows (.mappings()) to plain dicts """
+    return [dict(row) for row in rows]
@@ -0,0 +1,103 @@
+"""
+Per-table write version counters behind the list endpoints' ETags.
+
+Session events record which tables a transaction wrote (flushed ORM objects
+plus bulk insert/update/delete statements, and for deletes every table the
+database's ON DELETE CASCADE foreign keys reach) and bump their counters once the
+transaction commits; writes rolled back with the whole transaction bump nothing. An ETag derived from
+the versions of the tables an endpoint reads changes exactly when one of them
+was written, so If-None-Match can be answered with 304 before a session or
+connection is opened.
+
+Counters are per process. Writes made by other workers (or by scripts) are
+not seen, so the ETag also includes a time epoch of TABLE_VERSION_EPOCH_SECONDS:
+across processes a client may keep a stale 304 for at most that long.
+"""
+import os
+import threading
+import time
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+TABLE_VERSION_EPOCH_SECONDS = int(os.getenv("TABLE_VERSION_EPOCH_SECONDS", "30"))
+
+_WRITTEN = "written_tables"
+
+
+class TableVersions:
+
+    def __init__(self):
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    def bump(self, tables):
+        with self._lock:
+            for table in tables:
+                self._versions[table] = self._versions.get(table, 0) + 1
+
+    def get(self, table: str) -> int:
+        return self._versions.get(table, 0)
+
+    def snapshot(self, tables) -> tuple:
+        return tuple(self._versions.get(table, 0) for table in tables)
+
+
+table_versions = TableVersions()
+
+
+def current_epoch() -> int:
+    return int(time.time() // TABLE_VERSION_EPOCH_SECONDS) if TABLE_VERSION_EPOCH_SECONDS > 0 else 0
+
+
+def cascaded_tables(table) -> set:
+    """ Names of the tables whose rows a DELETE on `table` removes through ON DELETE CASCADE, itself included """
+    found = {table.name}
+    pending = [table]
+    while pending:
+        parent = pending.pop()
+        for child in table.metadata.tables.values():
+            if child.name in found:
+                continue
+            if any(fk.ondelete and fk.ondelete.upper() == "CASCADE" and fk.column.table is parent
+                   for fk in child.foreign_keys):
+                found.add(child.name)
+                pending.append(child)
+    return found
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_flushed_tables(session, flush_context):
+    written = session.info.setdefault(_WRITTEN, set())
+    for obj in (*session.new, *session.dirty):
+        table = getattr(type(obj), "__table__", None)
+        if table is not None:
+            written.add(table.name)
+    for obj in session.deleted:
+        table = getattr(type(obj), "__table__", None)
+        if table is not None:
+            # e.g. deleting a user removes their fundraisers, which the card list ETags read
+            written.update(cascaded_tables(table))
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _collect_statement_tables(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        table = getattr(orm_execute_state.statement, "table", None)
+        if table is not None:
+            written = orm_execute_state.session.info.setdefault(_WRITTEN, set())
+            written.update(cascaded_tables(table) if orm_execute_state.is_delete else (table.name,))
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_committed_tables(session):
+    written = session.info.pop(_WRITTEN, None)
+    if written:
+        table_versions.bump(written)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _forget_uncommitted_tables(session, transaction):
+    # Only when the outermost transaction ends (after_commit has already run for
+    # commits). A rolled back savepoint keeps its tables: over-bumping is harmless.
+    if transaction.parent is None:
+        session.info.pop(_WRITTEN, None)
@@ -0,0 +1,58 @@
+"""
+Content-hash deduplication for document uploads.
+
+Documents are keyed by the SHA-256 of their decoded bytes. A digest seen
+before resolves to the stored secure_url (LRU first, then the
+upload_digests table), so resubmitting the same ID proof or retrying a
+failed create costs a hash instead of a Cloudinary upload.
+"""
+import hashlib
+from sqlalchemy.exc import IntegrityError
+from app.database import sessionLocal
+from app.core.cache import upload_digest_cache
+from app.models.upload_digest_model import UploadDigest
+
+CHUNK_SIZE = 1024 * 1024
+
+
+def file_digest(path: str, variant: str = "") -> str:
+    """
+    SHA-256 of a spool file, read in chunks to keep memory flat.
+    variant separates uploads of the same bytes that are processed differently before upload.
+    """
+    sha = hashlib.sha256()
+    if variant:
+        sha.update(variant.encode("utf-8") + b"\0")
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def lookup_digest(digest: str, session_factory=sessionLocal) -> str | None:
+    url = upload_digest_cache.get(digest)
+    if url is not None:
+        return url
+
+    db = session_factory()
+    try:
+        row = db.query(UploadDigest).filter(UploadDigest.digest == digest).first()
+    finally:
+        db.close()
+    if row is None:
+        return None
+    upload_digest_cache.set(digest, row.secure_url)
+    return row.secure_url
+
+
+def remember_digest(digest: str, secure_url: str, session_factory=sessionLocal):
+    upload_digest_cache.set(digest, secure_url)
+    db = session_factory()
+    try:
+        db.add(UploadDigest(digest=digest, secure_url=secure_url))
+        db.commit()
+    except IntegrityError:
+        # Another worker stored the same document first
+        db.rollback()
+    finally:
+        db.close()
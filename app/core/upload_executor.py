@@ -0,0 +1,103 @@
+"""
+Dedicated executor for blocking Cloudinary uploads.
+
+Uploads run on their own thread pool instead of the default loop executor
+shared with every other asyncio.to_thread call, and a global semaphore caps
+how many are in flight across all requests. Extra uploads wait their turn
+(visible as queue depth) rather than piling onto the shared pool.
+"""
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from app.core.metrics import upload_duration
+
+UPLOAD_POOL_SIZE = int(os.getenv("UPLOAD_POOL_SIZE", "8"))
+UPLOAD_MAX_IN_FLIGHT = int(os.getenv("UPLOAD_MAX_IN_FLIGHT", str(UPLOAD_POOL_SIZE)))
+UPLOAD_TIMEOUT_SECONDS = float(os.getenv("UPLOAD_TIMEOUT_SECONDS", "60"))
+
+
+class UploadMetrics:
+    """ Counters for the upload executor; only touched from the event loop """
+
+    def __init__(self):
+        self.waiting = 0
+        self.in_flight = 0
+        self.completed = 0
+        self.failed = 0
+        self.timed_out = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+
+    def record(self, seconds: float):
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+
+    def snapshot(self):
+        finished = self.completed + self.failed + self.timed_out
+        return {
+            "queue_depth": self.waiting,
+            "in_flight": self.in_flight,
+            "completed": self.completed,
+            "failed": self.failed,
+            "timed_out": self.timed_out,
+            "avg_seconds": round(self.total_seconds / finished, 4) if finished else 0.0,
+            "max_seconds": round(self.max_seconds, 4),
+        }
+
+
+class UploadExecutor:
+
+    def __init__(self, pool_size: int = UPLOAD_POOL_SIZE, max_in_flight: int = UPLOAD_MAX_IN_FLIGHT,
+                 timeout: float = UPLOAD_TIMEOUT_SECONDS):
+        self.pool_size = pool_size
+        self.max_in_flight = max_in_flight
+        self.timeout = timeout
+        self.metrics = UploadMetrics()
+        self._executor = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix="upload")
+        self._semaphore = None
+        self._loop = None
+
+    def _get_semaphore(self):
+        # asyncio primitives belong to one loop; create it on the running one
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(self.max_in_flight)
+        return self._semaphore
+
+    async def run(self, fn, *args):
+        """
+        Runs a blocking upload call on the dedicated pool.
+        Raises TimeoutError after `timeout` seconds; the semaphore slot is freed
+        then, while the worker thread finishes (or times out) on its own.
+        """
+        semaphore = self._get_semaphore()
+        loop = asyncio.get_running_loop()
+        self.metrics.waiting += 1
+        async with semaphore:
+            self.metrics.waiting -= 1
+            self.metrics.in_flight += 1
+            start = time.perf_counter()
+            outcome = "failed"
+            try:
+                result = await asyncio.wait_for(loop.run_in_executor(self._executor, fn, *args), self.timeout)
+            except asyncio.TimeoutError:
+                self.metrics.timed_out += 1
+                outcome = "timed_out"
+                raise
+            except Exception:
+                self.metrics.failed += 1
+                raise
+            else:
+                self.metrics.completed += 1
+                outcome = "completed"
+                return result
+            finally:
+                elapsed = time.perf_counter() - start
+                self.metrics.in_flight -= 1
+                self.metrics.record(elapsed)
+                upload_duration.observe(elapsed, outcome)
+
+
+upload_executor = UploadExecutor()
@@ -0,0 +1,133 @@
+import asyncio
+import base64
+import binascii
+import os
+import shutil
+import tempfile
+import threading
+from fastapi import HTTPException, Request
+from starlette.datastructures import UploadFile
+from app.core.upload_executor import upload_executor, UPLOAD_TIMEOUT_SECONDS
+from app.core.upload_cache import file_digest, lookup_digest, remember_digest
+from app.core.image_processing import preprocess_image, DISPLAY_IMAGE_FIELDS
+
+# The four campaign documents, stored as Cloudinary URLs on fundraiser_master
+DOCUMENT_FIELDS = ["medical_report_url", "hospital_report_url", "id_proof_url", "campaign_image_url"]
+
+# Size limits for multipart campaign submissions
+MAX_UPLOAD_FILE_BYTES = int(os.getenv("MAX_UPLOAD_FILE_BYTES", str(10 * 1024 * 1024)))
+MAX_UPLOAD_TOTAL_BYTES = int(os.getenv("MAX_UPLOAD_TOTAL_BYTES", str(25 * 1024 * 1024)))
+MAX_FORM_FIELDS = 50
+
+# Where documents wait on disk until the background uploader picks them up
+UPLOAD_SPOOL_DIR = os.getenv("UPLOAD_SPOOL_DIR") or tempfile.gettempdir()
+
+
+async def read_document_form(request: Request):
+    """
+    Parses a multipart campaign submission.
+    Starlette streams each file part into a SpooledTemporaryFile (kept in memory
+    up to 1 MB, then rolled over to disk), so peak memory stays bounded whatever
+    the document size. Returns (text fields, {document field: UploadFile}).
+    """
+    content_length = request.headers.get("content-length")
+    if content_length is None:
+        # Without a declared length we can't enforce the total limit up front
+        raise HTTPException(status_code=411, detail="Content-Length header is required")
+    if int(content_length) > MAX_UPLOAD_TOTAL_BYTES:
+        raise HTTPException(status_code=413, detail=f"Request body exceeds {MAX_UPLOAD_TOTAL_BYTES} bytes")
+
+    form = await request.form(max_files=len(DOCUMENT_FIELDS), max_fields=MAX_FORM_FIELDS)
+    fields = {}
+    files = {}
+    for key, value in form.multi_items():
+        if isinstance(value, UploadFile):
+            if key not in DOCUMENT_FIELDS:
+                raise HTTPException(status_code=400, detail=f"Unexpected file field '{key}'")
+            if not value.filename or not value.size:
+                continue
+            if value.size > MAX_UPLOAD_FILE_BYTES:
+                raise HTTPException(status_code=413, detail=f"{key} exceeds {MAX_UPLOAD_FILE_BYTES} bytes")
+            files[key] = value
+        elif key not in DOCUMENT_FIELDS:
+            fields[key] = value
+    return fields, files
+
+
+_cloudinary_lock = threading.Lock()
+_cloudinary_ready = False
+
+
+def _configure_cloudinary():
+    """ Configures the Cloudinary client on first use instead of at app import """
+    global _cloudinary_ready
+    with _cloudinary_lock:
+        if _cloudinary_ready:
+            return
+        import cloudinary
+        cloudinary.config(
+            cloud_name=os.getenv("CLOUDINARY_CLOUD_NAME"),
+            api_key=os.getenv("CLOUDINARY_API_KEY"),
+            api_secret=os.getenv("CLOUDINARY_API_SECRET"),
+        )
+        _cloudinary_ready = True
+
+
+def upload_to_cloudinary(source) -> str:
+    """
+    Blocking upload of one document; returns its secure_url.
+    source can be a base64 data URI, a file path or an open binary file.
+    """
+    _configure_cloudinary()
+    import cloudinary.uploader
+
+    if hasattr(source, "seek"):
+        source.seek(0)
+    return cloudinary.uploader.upload(source, timeout=UPLOAD_TIMEOUT_SECONDS)["secure_url"]
+
+
+def spool_data_uri(data_uri: str) -> str:
+    """ Decodes a base64 data URI into a spool file and returns its path """
+    try:
+        _, encoded = data_uri.split(",", 1)
+        content = base64.b64decode(encoded, validate=True)
+    except (ValueError, binascii.Error):
+        raise HTTPException(status_code=400, detail="Document is not a valid base64 data URI")
+
+    with tempfile.NamedTemporaryFile(dir=UPLOAD_SPOOL_DIR, prefix="lifegivers-", delete=False) as spool:
+        spool.write(content)
+    return spool.name
+
+
+def spool_upload_file(upload: UploadFile) -> str:
+    """
+    Copies a multipart file part into a spool file that outlives the request
+    (FastAPI closes the UploadFile once the response is sent).
+    """
+    upload.file.seek(0)
+    with tempfile.NamedTemporaryFile(dir=UPLOAD_SPOOL_DIR, prefix="lifegivers-", delete=False) as spool:
+        shutil.copyfileobj(upload.file, spool)
+    return spool.name
+
+
+async def upload_document(path: str, field: str) -> str:
+    """
+    Default uploader used by the media ingest workers.
+    Checks the content-hash cache first (keyed on the bytes as submitted),
+    then preprocesses images for their field before uploading unseen documents.
+    """
+    # A card image is stored shrunk, so it must not share a cache entry with a full-size document
+    variant = "display" if field in DISPLAY_IMAGE_FIELDS else ""
+    digest = await asyncio.to_thread(file_digest, path, variant)
+    url = await asyncio.to_thread(lookup_digest, digest)
+    if url is not None:
+        return url
+
+    processed = await preprocess_image(path, field)
+    try:
+        url = await upload_executor.run(upload_to_cloudinary, processed or path)
+    finally:
+        if processed:
+            os.remove(processed)
+    await asyncio.to_thread(remember_digest, digest, url)
+    return url
@@ -1,16 +1,245 @@
 from dotenv import load_dotenv
+import asyncio
 import os
+import threading
+import time
 from sqlalchemy.orm import sessionmaker,declarative_base
 from sqlalchemy import create_engine
+from sqlalchemy.pool import NullPool, QueuePool, AsyncAdaptedQueuePool
+from starlette.concurrency import run_in_threadpool
+from app.core.query_profiler import attach_profile
+from app.core import table_versions  # noqa: F401 - registers the Session write-tracking events
 
 load_dotenv()
-engine = create_engine(os.getenv("DB_URL"))
+DB_URL = os.getenv("DB_URL")
+
+# Connection pool settings. On serverless deployments (Vercel) every instance
+# keeps its own pool, so keep DB_POOL_SIZE + DB_MAX_OVERFLOW small or set
+# DB_USE_NULLPOOL=true and put an external pooler (PgBouncer, Supabase/Neon
+# pooler) in front of Postgres.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "5"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+DB_USE_NULLPOOL = os.getenv("DB_USE_NULLPOOL", "false").lower() == "true"
+# Server-side statement timeout (Postgres only, 0 = off). Sent as a startup
+# option, which transaction-mode PgBouncer rejects; configure it on the pooler there.
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "0"))
+# DB_ASYNC=true serves the fundraiser, donation and stats routers from an
+# AsyncEngine (asyncpg / aiosqlite). Off by default: those routers then run
+# the same code against the sync engine through ThreadedSession below.
+DB_ASYNC = os.getenv("DB_ASYNC", "false").lower() == "true"
+
+
+class PoolMetrics:
+    """ How long requests wait to check a connection out of the pool """
+
+    def __init__(self):
+        self.checkouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self._lock = threading.Lock()
+
+    def record_wait(self, seconds: float):
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait += seconds
+            self.max_wait = max(self.max_wait, seconds)
+
+
+pool_metrics = PoolMetrics()
+async_pool_metrics = PoolMetrics()
+
+
+class TimedQueuePool(QueuePool):
+    """ QueuePool that records checkout wait time in pool_metrics """
+    metrics = pool_metrics
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            self.metrics.record_wait(time.perf_counter() - start)
+
+
+class TimedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """ Same as TimedQueuePool, for the async engine """
+    metrics = async_pool_metrics
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            self.metrics.record_wait(time.perf_counter() - start)
+
+
+def _engine_options(url: str, asynchronous: bool = False):
+    options = {"pool_pre_ping": DB_POOL_PRE_PING}
+    if url.startswith("postgresql") and DB_STATEMENT_TIMEOUT_MS:
+        if asynchronous:
+            options["connect_args"] = {"server_settings": {"statement_timeout": str(DB_STATEMENT_TIMEOUT_MS)}}
+        else:
+            options["connect_args"] = {"options": f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"}
+    if DB_USE_NULLPOOL:
+        options["poolclass"] = NullPool
+    else:
+        options.update(
+            poolclass=TimedAsyncQueuePool if asynchronous else TimedQueuePool,
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+            pool_recycle=DB_POOL_RECYCLE,
+        )
+    return options
+
+
+def _async_url(url: str) -> str:
+    """ Swaps the sync DBAPI driver in DB_URL for its asyncio counterpart """
+    scheme, rest = url.split("://", 1)
+    if scheme.startswith("postgres"):
+        return "postgresql+asyncpg://" + rest
+    if scheme.startswith("sqlite"):
+        return "sqlite+aiosqlite://" + rest
+    return url
+
+
+engine = create_engine(DB_URL, **_engine_options(DB_URL))
 sessionLocal = sessionmaker(autoflush=False,autocommit=False,bind=engine)
 Base = declarative_base()
 
 def get_db():
+    attach_profile()
     db = sessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+class ThreadedSession:
+    """
+    AsyncSession-compatible facade over a sync Session, used when DB_ASYNC is off.
+    Every database call runs in the threadpool, so async endpoints never block the loop.
+    """
+
+    def __init__(self, session):
+        self.sync_session = session
+
+    def add(self, instance):
+        self.sync_session.add(instance)
+
+    def add_all(self, instances):
+        self.sync_session.add_all(instances)
+
+    async def execute(self, statement, params=None):
+        return await run_in_threadpool(self.sync_session.execute, statement, params)
+
+    async def scalar(self, statement, params=None):
+        return await run_in_threadpool(self.sync_session.scalar, statement, params)
+
+    async def get(self, entity, ident):
+        return await run_in_threadpool(self.sync_session.get, entity, ident)
+
+    async def flush(self):
+        await run_in_threadpool(self.sync_session.flush)
+
+    async def commit(self):
+        await run_in_threadpool(self.sync_session.commit)
+
+    async def rollback(self):
+        await run_in_threadpool(self.sync_session.rollback)
+
+    async def refresh(self, instance):
+        await run_in_threadpool(self.sync_session.refresh, instance)
+
+    async def delete(self, instance):
+        await run_in_threadpool(self.sync_session.delete, instance)
+
+    async def run_sync(self, fn, *args, **kwargs):
+        return await run_in_threadpool(fn, self.sync_session, *args, **kwargs)
+
+    async def close(self):
+        await run_in_threadpool(self.sync_session.close)
+
+
+async_engine = None
+AsyncSessionLocal = None
+if DB_ASYNC:
+    from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+    async_engine = create_async_engine(_async_url(DB_URL), **_engine_options(DB_URL, asynchronous=True))
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+
+async def get_async_db():
+    """
+    Session dependency for async endpoints. Yields an AsyncSession when DB_ASYNC
+    is on, otherwise a ThreadedSession over the sync engine; both expose the same API.
+    """
+    attach_profile()
+    if AsyncSessionLocal is not None:
+        async with AsyncSessionLocal() as db:
+            yield db
+        return
+
+    # A ThreadedSession keeps its connection between awaits. Wait for a free
+    # pool slot here, on the loop: waiting inside QueuePool would park threadpool
+    # threads that the sessions holding connections need in order to finish.
+    slots = _threaded_session_slots()
+    if slots is not None:
+        await slots.acquire()
+    db = ThreadedSession(sessionLocal(expire_on_commit=False))
+    try:
+        yield db
+    finally:
+        try:
+            await db.close()
+        finally:
+            if slots is not None:
+                slots.release()
+
+
+_slots = None
+_slots_loop = None
+
+def _threaded_session_slots():
+    global _slots, _slots_loop
+    if DB_USE_NULLPOOL:
+        return None
+    loop = asyncio.get_running_loop()
+    if _slots_loop is not loop:
+        _slots_loop = loop
+        _slots = asyncio.Semaphore(DB_POOL_SIZE + DB_MAX_OVERFLOW)
+    return _slots
+
+def _pool_stats(pool, metrics: PoolMetrics):
+    if not isinstance(pool, QueuePool):
+        return {"pool": type(pool).__name__}
+
+    capacity = pool.size() + DB_MAX_OVERFLOW
+    checked_out = pool.checkedout()
+    with metrics._lock:
+        checkouts = metrics.checkouts
+        total_wait = metrics.total_wait
+        max_wait = metrics.max_wait
+    return {
+        "pool": type(pool).__name__,
+        "size": pool.size(),
+        "max_overflow": DB_MAX_OVERFLOW,
+        "checked_out": checked_out,
+        "checked_in": pool.checkedin(),
+        "overflow": pool.overflow(),
+        "utilization": round(checked_out / capacity, 4) if capacity else 0.0,
+        "checkouts": checkouts,
+        "avg_checkout_wait_seconds": round(total_wait / checkouts, 6) if checkouts else 0.0,
+        "max_checkout_wait_seconds": round(max_wait, 6),
+    }
+
+def pool_status():
+    """ Current pool utilization plus checkout wait statistics """
+    status = _pool_stats(engine.pool, pool_metrics)
+    if async_engine is not None:
+        status["async_pool"] = _pool_stats(async_engine.sync_engine.pool, async_pool_metrics)
+    return status
@@ -1,11 +1,15 @@
 import logging
-import os
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
-from app.database import Base, engine
+from app.core.serializers import FastJSONResponse
+from app.core.compression import CompressionMiddleware
+from app.core.metrics import RequestMetricsMiddleware, instrument_engine, registry
+from app.core.media_ingest import media_ingest
+from app.database import engine, async_engine
 from app.routers import users_router, fundraiser_router, donation_router, stats_router, platform_stats_router, success_story_router
-import cloudinary
 
 load_dotenv()
 
@@ -13,21 +17,31 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("uvicorn")
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Ingest workers plus their recovery sweep, which runs in the background
+    # and never delays the first request
+    media_ingest.start()
+    yield
+
+
 app = FastAPI(
     title="Crowd funding website running",
-    redirect_slashes=True
+    lifespan=lifespan,
+    redirect_slashes=True,
+    # orjson rendering for every endpoint; hot paths also skip jsonable_encoder (app/core/serializers.py)
+    default_response_class=FastJSONResponse,
 )
 
-@app.middleware("http")
-async def log_requests(request, call_next):
-    logger.info(f"Incoming request: {request.method} {request.url}")
-    try:
-        response = await call_next(request)
-        logger.info(f"Response status: {response.status_code}")
-        return response
-    except Exception as e:
-        logger.error(f"Error processing request: {str(e)}")
-        raise
+# gzip/brotli for responses over COMPRESSION_MIN_BYTES; innermost, so the metrics include its cost
+app.add_middleware(CompressionMiddleware)
+
+# Latency histograms, in-flight gauge and per-request DB stats for /metrics.
+# Request logging lives here too: a LOG_SAMPLE_RATE sample plus every slow or failed request.
+app.add_middleware(RequestMetricsMiddleware)
+instrument_engine(engine)
+if async_engine is not None:
+    instrument_engine(async_engine.sync_engine)
 
 # Permissive CORS for local development - Outermost layer
 app.add_middleware(
@@ -38,15 +52,10 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# DB tables
-Base.metadata.create_all(bind=engine)
-
-# Cloudinary config
-cloudinary.config(
-    cloud_name=os.getenv("CLOUDINARY_CLOUD_NAME"),
-    api_key=os.getenv("CLOUDINARY_API_KEY"),
-    api_secret=os.getenv("CLOUDINARY_API_SECRET"),
-)
+# Nothing here talks to the database or Cloudinary at import time, so serverless
+# cold starts go straight to serving. The schema is managed out-of-band with
+# `python scripts/migrate.py upgrade`; Cloudinary is configured on first upload
+# (app/core/uploads.py).
 
 # Routers
 app.include_router(users_router.router)
@@ -56,6 +65,11 @@ app.include_router(stats_router.router)
 app.include_router(platform_stats_router.router)
 app.include_router(success_story_router.router)
 
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """ Prometheus scrape endpoint """
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
 @app.get("/")
 def greet():
     return {
@@ -0,0 +1,141 @@
+"""
+Versioned schema migrations.
+
+Each module in app/migrations/versions defines:
+
+    VERSION        unique, increasing integer
+    TRANSACTIONAL  False for steps that can't run inside a transaction
+                   (CREATE INDEX CONCURRENTLY on Postgres)
+    upgrade(ctx)   applies the step through a MigrationContext
+
+Applied versions are recorded in the schema_migrations table. Steps are
+written to be idempotent so a fresh database and one that predates the
+runner both converge on the same schema. Run them with scripts/migrate.py.
+"""
+import importlib
+import pkgutil
+from datetime import datetime
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, inspect, select, text
+
+import app.models
+from app.migrations import versions
+
+_metadata = MetaData()
+schema_migrations = Table(
+    "schema_migrations",
+    _metadata,
+    Column("version", Integer, primary_key=True),
+    Column("name", String, nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+
+class MigrationContext:
+    """ Connection plus the dialect-aware helpers migrations are written against """
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.dialect = connection.dialect.name
+
+    def execute(self, sql: str, **params):
+        return self.connection.execute(text(sql), params)
+
+    def has_table(self, table: str) -> bool:
+        return inspect(self.connection).has_table(table)
+
+    def has_column(self, table: str, column: str) -> bool:
+        return any(col["name"] == column for col in inspect(self.connection).get_columns(table))
+
+    def create_tables(self, *tables):
+        """ Creates SQLAlchemy Table objects (and their indexes) that don't exist yet """
+        for table in tables:
+            table.create(self.connection, checkfirst=True)
+
+    def create_index(self, name: str, table: str, columns: list[str], concurrently: bool = True,
+                     using: str | None = None):
+        """
+        Creates an index if it's missing. On Postgres it is built CONCURRENTLY
+        (no write lock on the table), which needs a non-transactional migration;
+        an INVALID index left by an earlier failed build is dropped and rebuilt.
+        `using` picks the index method (e.g. "gin") where the dialect supports it.
+        """
+        column_list = ", ".join(columns)
+        if using:
+            column_list = f"USING {using} ({column_list})"
+        else:
+            column_list = f"({column_list})"
+        if self.dialect == "postgresql" and concurrently:
+            invalid = self.execute(
+                "SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+                "WHERE c.relname = :name AND NOT i.indisvalid",
+                name=name,
+            ).first()
+            if invalid:
+                self.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+            self.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} {column_list}")
+        else:
+            self.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table} {column_list}")
+
+
+def _import_models():
+    """ Registers every model on Base.metadata so foreign keys between tables resolve """
+    for info in pkgutil.iter_modules(app.models.__path__):
+        importlib.import_module(f"{app.models.__name__}.{info.name}")
+
+
+def load_migrations():
+    """ Every migration module, ordered by VERSION """
+    modules = [
+        importlib.import_module(f"{versions.__name__}.{info.name}")
+        for info in pkgutil.iter_modules(versions.__path__)
+    ]
+    modules.sort(key=lambda module: module.VERSION)
+    seen = set()
+    for module in modules:
+        if module.VERSION in seen:
+            raise RuntimeError(f"Duplicate migration version {module.VERSION}")
+        seen.add(module.VERSION)
+    return modules
+
+
+def _name(module) -> str:
+    return module.__name__.rsplit(".", 1)[-1]
+
+
+def applied_versions(engine) -> dict:
+    _metadata.create_all(engine)
+    with engine.connect() as connection:
+        rows = connection.execute(select(schema_migrations.c.version, schema_migrations.c.applied_at))
+        return {version: applied_at for version, applied_at in rows}
+
+
+def status(engine):
+    """ [(version, name, applied_at or None)] for every known migration """
+    applied = applied_versions(engine)
+    return [(m.VERSION, _name(m), applied.get(m.VERSION)) for m in load_migrations()]
+
+
+def upgrade(engine, target: int | None = None, log=print):
+    """ Applies pending migrations up to and including target (default: all) """
+    _import_models()
+    applied = applied_versions(engine)
+    done = []
+    for module in load_migrations():
+        if module.VERSION in applied or (target is not None and module.VERSION > target):
+            continue
+
+        log(f"Applying {_name(module)}...")
+        record = schema_migrations.insert().values(
+            version=module.VERSION, name=_name(module), applied_at=datetime.utcnow()
+        )
+        if getattr(module, "TRANSACTIONAL", True):
+            with engine.begin() as connection:
+                module.upgrade(MigrationContext(connection))
+                connection.execute(record)
+        else:
+            with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+                module.upgrade(MigrationContext(connection))
+            with engine.begin() as connection:
+                connection.execute(record)
+        done.append(module.VERSION)
+    return done
@@ -0,0 +1,19 @@
+""" Core tables that existed before versioned migrations """
+VERSION = 1
+TRANSACTIONAL = True
+
+
+def upgrade(ctx):
+    from app.models.user_model import User
+    from app.models.fundraiser_model import FundraiserMaster
+    from app.models.donation_model import Donations
+    from app.models.platform_stats_model import PlatformStats
+    from app.models.success_story_model import SuccessStory
+
+    ctx.create_tables(
+        User.__table__,
+        FundraiserMaster.__table__,
+        Donations.__table__,
+        PlatformStats.__table__,
+        SuccessStory.__table__,
+    )
@@ -0,0 +1,10 @@
+""" fundraiser_master.status for the admin approval flow (was scripts/add_status_column.py) """
+VERSION = 2
+TRANSACTIONAL = True
+
+
+def upgrade(ctx):
+    if ctx.has_column("fundraiser_master", "status"):
+        return
+    ctx.execute("ALTER TABLE fundraiser_master ADD COLUMN status VARCHAR DEFAULT 'pending'")
+    ctx.execute("UPDATE fundraiser_master SET status = 'pending' WHERE status IS NULL")
@@ -0,0 +1,9 @@
+""" Composite indexes behind the keyset-paginated GET /fundraiser/ filters (was scripts/add_fundraiser_indexes.py) """
+VERSION = 3
+TRANSACTIONAL = False
+
+
+def upgrade(ctx):
+    ctx.create_index("ix_fundraiser_status_id", "fundraiser_master", ["status", "fundraiser_id"])
+    ctx.create_index("ix_fundraiser_category_id", "fundraiser_master", ["category", "fundraiser_id"])
+    ctx.create_index("ix_fundraiser_location_id", "fundraiser_master", ["location", "fundraiser_id"])
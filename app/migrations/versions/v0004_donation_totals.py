@@ -0,0 +1,14 @@
+""" Running donation totals, backfilled from the donations already recorded """
+VERSION = 4
+TRANSACTIONAL = True
+
+
+def upgrade(ctx):
+    from sqlalchemy.orm import Session
+    from app.models.donation_totals_model import FundraiserTotals, PlatformTotals
+    from app.core.donation_totals import rebuild_totals
+
+    ctx.create_tables(FundraiserTotals.__table__, PlatformTotals.__table__)
+    with Session(bind=ctx.connection) as db:
+        rebuild_totals(db)
+        db.flush()
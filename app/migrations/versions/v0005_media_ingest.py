@@ -0,0 +1,10 @@
+""" Background upload state and the content-hash upload cache """
+VERSION = 5
+TRANSACTIONAL = True
+
+
+def upgrade(ctx):
+    from app.models.fundraiser_document_model import FundraiserDocument
+    from app.models.upload_digest_model import UploadDigest
+
+    ctx.create_tables(FundraiserDocument.__table__, UploadDigest.__table__)
@@ -0,0 +1,12 @@
+"""
+Indexes for the donation hot paths: per-campaign history by date and per-user lookups.
+fundraiser_master(status) lookups are already served by ix_fundraiser_status_id
+(status is its leading column), so no separate status index is added.
+"""
+VERSION = 6
+TRANSACTIONAL = False
+
+
+def upgrade(ctx):
+    ctx.create_index("ix_donations_fundraiser_date", "donations", ["fundraiser_id", "donation_date"])
+    ctx.create_index("ix_donations_user_id", "donations", ["user_id"])
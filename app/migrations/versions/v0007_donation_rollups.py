@@ -0,0 +1,14 @@
+""" Time-bucketed donation rollups, backfilled from the donations already recorded """
+VERSION = 7
+TRANSACTIONAL = True
+
+
+def upgrade(ctx):
+    from sqlalchemy.orm import Session
+    from app.models.donation_rollup_model import DonationRollup
+    from app.core.donation_rollups import rebuild_rollups
+
+    ctx.create_tables(DonationRollup.__table__)
+    with Session(bind=ctx.connection) as db:
+        rebuild_rollups(db)
+        db.flush()
@@ -0,0 +1,51 @@
+"""
+Full-text search over campaigns: a tsvector column plus GIN index on
+Postgres, an FTS5 table with sync triggers on SQLite (see app/core/search.py).
+
+Online on Postgres: the column is added as a plain nullable column (a catalog-only
+change, no table rewrite), a trigger keeps new and edited rows current, existing
+rows are backfilled in short batches of SEARCH_BACKFILL_BATCH, each committed on
+its own, and the GIN index is built CONCURRENTLY. Only the ADD COLUMN and
+CREATE TRIGGER statements take a brief ACCESS EXCLUSIVE lock.
+"""
+VERSION = 8
+TRANSACTIONAL = False
+
+SEARCH_BACKFILL_BATCH = 1000
+
+
+def _is_generated(ctx) -> bool:
+    # Databases that ran an earlier draft of this step have a GENERATED column: already complete
+    return ctx.execute(
+        "SELECT 1 FROM information_schema.columns WHERE table_name = 'fundraiser_master' "
+        "AND column_name = 'search_vector' AND is_generated = 'ALWAYS'"
+    ).first() is not None
+
+
+def upgrade(ctx):
+    from app.core.search import (POSTGRES_SEARCH_TRIGGER, postgres_search_trigger_ddl,
+                                 postgres_search_vector, sqlite_search_ddl)
+
+    if ctx.dialect == "postgresql":
+        if not _is_generated(ctx):
+            ctx.execute("ALTER TABLE fundraiser_master ADD COLUMN IF NOT EXISTS search_vector tsvector")
+            has_trigger = ctx.execute(
+                "SELECT 1 FROM pg_trigger WHERE tgname = :name", name=POSTGRES_SEARCH_TRIGGER
+            ).first()
+            function_ddl, trigger_ddl = postgres_search_trigger_ddl()
+            ctx.execute(function_ddl)
+            if not has_trigger:
+                ctx.execute(trigger_ddl)
+
+            # Rows written from here on are filled by the trigger; fill the rest a batch at a time
+            while ctx.execute(
+                f"UPDATE fundraiser_master SET search_vector = {postgres_search_vector()} "
+                "WHERE fundraiser_id IN (SELECT fundraiser_id FROM fundraiser_master "
+                "WHERE search_vector IS NULL ORDER BY fundraiser_id LIMIT :batch)",
+                batch=SEARCH_BACKFILL_BATCH,
+            ).rowcount:
+                pass
+        ctx.create_index("ix_fundraiser_search_vector", "fundraiser_master", ["search_vector"], using="gin")
+    elif ctx.dialect == "sqlite":
+        for statement in sqlite_search_ddl():
+            ctx.execute(statement)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, Float, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, Text, Float, ForeignKey, DateTime, Index
 from app.database import Base
 from datetime import datetime
 
@@ -12,3 +12,8 @@ class Donations(Base):
     amount = Column(Float)
     payment_method = Column(String)  # UPI, GPay, PhonePay, BankTransfer
     donation_date = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_donations_fundraiser_date", "fundraiser_id", "donation_date"),
+        Index("ix_donations_user_id", "user_id"),
+    )
@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, Date
+from app.database import Base
+
+class DonationRollup(Base):
+    """
+    Pre-aggregated donation counts/amounts per time bucket (UTC), fundraiser and payment method.
+    One row per (granularity, bucket_start, fundraiser_id, payment_method); granularity is
+    day, week (bucket_start = Monday) or month (bucket_start = 1st).
+    """
+    __tablename__ = "donation_rollups"
+
+    granularity = Column(String(5), primary_key=True)
+    bucket_start = Column(Date, primary_key=True)
+    fundraiser_id = Column(Integer, ForeignKey("fundraiser_master.fundraiser_id", ondelete="CASCADE"), primary_key=True)
+    payment_method = Column(String, primary_key=True)
+    donation_count = Column(Integer, default=0, nullable=False)
+    amount = Column(Float, default=0, nullable=False)
@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Integer, Float, ForeignKey, DateTime
+from app.database import Base
+
+class FundraiserTotals(Base):
+    """ Running donation totals for one fundraiser, kept in step with the donations table """
+    __tablename__ = "fundraiser_totals"
+
+    fundraiser_id = Column(Integer, ForeignKey("fundraiser_master.fundraiser_id", ondelete="CASCADE"), primary_key=True)
+    donor_count = Column(Integer, default=0, nullable=False)
+    amount_raised = Column(Float, default=0, nullable=False)
+    last_donation_at = Column(DateTime)
+
+class PlatformTotals(Base):
+    """ Platform-wide running donation totals (single row, id = 1) """
+    __tablename__ = "platform_totals"
+
+    id = Column(Integer, primary_key=True)
+    donor_count = Column(Integer, default=0, nullable=False)
+    amount_raised = Column(Float, default=0, nullable=False)
+    last_donation_at = Column(DateTime)
@@ -0,0 +1,19 @@
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, UniqueConstraint
+from app.database import Base
+from datetime import datetime
+
+class FundraiserDocument(Base):
+    """ Background upload progress of one campaign document (see app/core/media_ingest.py) """
+    __tablename__ = "fundraiser_documents"
+
+    id = Column(Integer, primary_key=True, index=True)
+    fundraiser_id = Column(Integer, ForeignKey("fundraiser_master.fundraiser_id", ondelete="CASCADE"), nullable=False, index=True)
+    field = Column(String, nullable=False)  # medical_report_url, hospital_report_url, id_proof_url, campaign_image_url
+    upload_state = Column(String, default="pending")  # pending, uploading, done, failed
+    attempts = Column(Integer, default=0)
+    last_error = Column(Text)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        UniqueConstraint("fundraiser_id", "field", name="uq_fundraiser_document_field"),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Text, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, Text, Boolean, ForeignKey, Index
 from app.database import Base
 
 class FundraiserMaster(Base):
@@ -31,3 +31,11 @@ class FundraiserMaster(Base):
 
     agreed_terms = Column(Boolean, default=False)
     status = Column(String, default="pending")
+
+    # Composite indexes backing the keyset-paginated list filters:
+    # WHERE <filter> = ? AND fundraiser_id < ? ORDER BY fundraiser_id DESC
+    __table_args__ = (
+        Index("ix_fundraiser_status_id", "status", "fundraiser_id"),
+        Index("ix_fundraiser_category_id", "category", "fundraiser_id"),
+        Index("ix_fundraiser_location_id", "location", "fundraiser_id"),
+    )
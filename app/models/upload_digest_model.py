@@ -0,0 +1,11 @@
+from sqlalchemy import Column, String, Text, DateTime
+from app.database import Base
+from datetime import datetime
+
+class UploadDigest(Base):
+    """ SHA-256 of an uploaded document's bytes -> its Cloudinary URL, so repeats skip the upload """
+    __tablename__ = "upload_digests"
+
+    digest = Column(String(64), primary_key=True)
+    secure_url = Column(Text, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
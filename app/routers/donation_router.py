@@ -1,26 +1,181 @@
-from fastapi import APIRouter, HTTPException, Depends
-from sqlalchemy.orm import Session
-from app.database import get_db
+import os
+from datetime import datetime
+from fastapi import APIRouter, HTTPException, Depends, Request, Query
+from pydantic import ValidationError
+from sqlalchemy import select, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_async_db
 from app.models.donation_model import Donations
-from app.schemas.donation_schema import DonationCreate
+from app.models.fundraiser_model import FundraiserMaster
+from app.models.user_model import User
+from app.schemas.donation_schema import DonationCreate, DonationBulkRow
+from app.core.donation_totals import record_donation, apply_batch_totals, sync_platform_funds_raised
+from app.core.donation_rollups import record_donation_rollups, add_to_rollups, apply_rollups
+from app.core.bulk_donations import read_rows
+from app.core.exports import export_response
+from app.core.serializers import FastJSONResponse, serialize_donation, rows_to_dicts
+from app.core.cache import stats_cache, platform_stats_cache
 
 router = APIRouter(prefix="/donations", tags=["Donations"])
 
+# Bulk ingestion limits
+BULK_CHUNK_SIZE = int(os.getenv("BULK_DONATION_CHUNK_SIZE", "1000"))
+BULK_MAX_ROWS = int(os.getenv("BULK_DONATION_MAX_ROWS", "100000"))
+BULK_MAX_REPORTED_ERRORS = 500
+
 @router.post("/")
-def create_donation(data: DonationCreate, db: Session = Depends(get_db)):
+async def create_donation(data: DonationCreate, db: AsyncSession = Depends(get_async_db)):
     donation = Donations(**data.model_dump())
     db.add(donation)
-    db.commit()
-    db.refresh(donation)
-    return donation
+    await db.flush()
+    # Keep the running totals in the same transaction as the donation
+    await db.run_sync(record_donation, donation)
+    await db.run_sync(record_donation_rollups, donation)
+    await db.run_sync(sync_platform_funds_raised)
+    await db.commit()
+    stats_cache.invalidate()
+    platform_stats_cache.invalidate()
+    return FastJSONResponse(serialize_donation(donation))
+
+def _apply_batch_totals(db, batch_totals: dict, batch_rollups: dict):
+    """ One totals update per fundraiser, one platform update and one rollup update per bucket for the whole batch """
+    apply_batch_totals(db, batch_totals)
+    apply_rollups(db, batch_rollups)
+    sync_platform_funds_raised(db)
+
+
+async def _existing_ids(db: AsyncSession, column, ids: set) -> set:
+    if not ids:
+        return set()
+    return set((await db.execute(select(column).where(column.in_(ids)))).scalars())
+
+
+async def _insert_chunk(db: AsyncSession, chunk: list, errors: list, batch_totals: dict, batch_rollups: dict):
+    """
+    Inserts one chunk with a single executemany, after dropping rows that point
+    at fundraisers or users which don't exist (they would fail the whole statement).
+    """
+    known_fundraisers = await _existing_ids(
+        db, FundraiserMaster.fundraiser_id, {row["fundraiser_id"] for _, row in chunk if row["fundraiser_id"] is not None})
+    known_users = await _existing_ids(
+        db, User.user_id, {row["user_id"] for _, row in chunk if row["user_id"] is not None})
+
+    values = []
+    for number, row in chunk:
+        fundraiser_id = row["fundraiser_id"]
+        row_errors = []
+        if fundraiser_id is not None and fundraiser_id not in known_fundraisers:
+            row_errors.append(f"fundraiser {fundraiser_id} does not exist")
+        if row["user_id"] is not None and row["user_id"] not in known_users:
+            row_errors.append(f"user {row['user_id']} does not exist")
+        if row_errors:
+            errors.append({"row": number, "errors": row_errors})
+            continue
+        values.append(row)
+        count, amount, last_at = batch_totals.get(fundraiser_id, (0, 0.0, None))
+        batch_totals[fundraiser_id] = (count + 1, amount + row["amount"], max(last_at or row["donation_date"], row["donation_date"]))
+        add_to_rollups(batch_rollups, fundraiser_id, row["payment_method"], row["donation_date"], row["amount"])
+
+    if values:
+        await db.execute(insert(Donations), values)
+    return len(values)
+
+
+@router.post("/bulk")
+async def create_donations_bulk(request: Request, all_or_nothing: bool = False,
+                                db: AsyncSession = Depends(get_async_db)):
+    """
+    Bulk ingestion for collection drives, gateway reconciliation and UPI settlement files.
+    Body: JSON array, CSV with a header row (text/csv) or NDJSON (application/x-ndjson),
+    using the DonationCreate fields plus an optional donation_date.
+    Valid rows are inserted in chunked executemany batches inside one transaction and
+    fundraiser totals and rollups are updated once per batch. Invalid rows are reported by row number;
+    with all_or_nothing=true any invalid row rolls the whole batch back.
+    """
+    errors = []
+    batch_totals = {}
+    batch_rollups = {}
+    chunk = []
+    inserted = 0
+    total_rows = 0
+    now = datetime.utcnow()
+
+    try:
+        async for number, raw, parse_error in read_rows(request):
+            total_rows = number
+            if total_rows > BULK_MAX_ROWS:
+                raise HTTPException(status_code=413, detail=f"Bulk uploads are limited to {BULK_MAX_ROWS} rows")
+            if parse_error:
+                errors.append({"row": number, "errors": [parse_error]})
+                continue
+            try:
+                row = DonationBulkRow(**raw).model_dump()
+            except ValidationError as e:
+                errors.append({"row": number, "errors": [f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors()]})
+                continue
+            row["donation_date"] = row["donation_date"] or now
+            chunk.append((number, row))
+
+            if len(chunk) >= BULK_CHUNK_SIZE:
+                inserted += await _insert_chunk(db, chunk, errors, batch_totals, batch_rollups)
+                chunk = []
+
+        if chunk:
+            inserted += await _insert_chunk(db, chunk, errors, batch_totals, batch_rollups)
+
+        if errors and all_or_nothing:
+            await db.rollback()
+            inserted = 0
+        elif inserted:
+            await db.run_sync(_apply_batch_totals, batch_totals, batch_rollups)
+            await db.commit()
+    except Exception:
+        await db.rollback()
+        raise
+
+    if inserted:
+        stats_cache.invalidate()
+        platform_stats_cache.invalidate()
+    errors.sort(key=lambda error: error["row"])
+    return {
+        "rows": total_rows,
+        "inserted": inserted,
+        "failed": len(errors),
+        "errors": errors[:BULK_MAX_REPORTED_ERRORS],
+    }
 
 @router.get("/")
-def get_all_donations(db: Session = Depends(get_db)):
-    return db.query(Donations).all()
+async def get_all_donations(db: AsyncSession = Depends(get_async_db)):
+    # Column-only select straight to dicts: no ORM hydration, no jsonable_encoder pass
+    columns = [getattr(Donations, field) for field in serialize_donation.fields]
+    rows = (await db.execute(select(*columns))).mappings().all()
+    return FastJSONResponse(rows_to_dicts(rows))
+
+@router.get("/export")
+async def export_donations(
+    format: str = Query("csv", description="csv or ndjson"),
+    start: datetime | None = Query(None, description="Include donations on or after this time"),
+    end: datetime | None = Query(None, description="Include donations before this time"),
+    fundraiser_id: int | None = None,
+):
+    """
+    Streams donations for finance reports as CSV or NDJSON, oldest first.
+    The body is compressed on the fly when the client sends Accept-Encoding.
+    """
+    columns = ["donation_id", "fundraiser_id", "user_id", "donor_name", "amount", "payment_method", "donation_date"]
+    query = select(*(getattr(Donations, column) for column in columns))
+    if fundraiser_id is not None:
+        query = query.where(Donations.fundraiser_id == fundraiser_id)
+    if start:
+        query = query.where(Donations.donation_date >= start)
+    if end:
+        query = query.where(Donations.donation_date < end)
+    query = query.order_by(Donations.donation_date, Donations.donation_id)
+    return export_response(query, columns, format, "donations")
 
 @router.get("/{donation_id}")
-def get_donation(donation_id: int, db: Session = Depends(get_db)):
-    donation = db.query(Donations).filter(Donations.donation_id == donation_id).first()
+async def get_donation(donation_id: int, db: AsyncSession = Depends(get_async_db)):
+    donation = await db.get(Donations, donation_id)
     if not donation:
         raise HTTPException(status_code=404, detail="Donation not found")
-    return donation
+    return FastJSONResponse(serialize_donation(donation))
@@ -1,108 +1,296 @@
-from fastapi import HTTPException, APIRouter, Depends
-from sqlalchemy.orm import Session
-from app.schemas.fundraiser_schema import FundraiserCreate
+from fastapi import HTTPException, APIRouter, Depends, Query, Request
+from fastapi.exceptions import RequestValidationError
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime
+from sqlalchemy import select, func
+from app.schemas.fundraiser_schema import FundraiserCreate, FundraiserPage, FundraiserSearchPage
 from app.models.fundraiser_model import FundraiserMaster
-from app.database import get_db
-import cloudinary.uploader
+from app.models.donation_totals_model import FundraiserTotals
+from app.models.fundraiser_document_model import FundraiserDocument
+from app.core.donation_totals import remove_fundraiser_totals, sync_platform_funds_raised
+from app.core.cache import stats_cache, platform_stats_cache
+from app.core.uploads import DOCUMENT_FIELDS, read_document_form, spool_data_uri, spool_upload_file
+from app.core.media_ingest import media_ingest, UploadJob
+from app.core.exports import export_response
+from app.core.search import build_search
+from app.core.serializers import FastJSONResponse, serialize_fundraiser, rows_to_dicts
+from app.core.http_cache import table_etag
+from app.database import get_async_db, engine
 
 router = APIRouter(
     prefix="/fundraiser",
     tags=["Fundraisers"]
 )
 
+# Page size limits for the campaign list endpoints
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+# The card lists read these tables; their write versions drive the list ETags
+card_list_etag = table_etag("fundraiser_master", "fundraiser_totals")
+
 import asyncio
 import logging
+import os
 
 # Configure logging to see what's happening
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# 1. CREATE FUNDRAISER (Async + Parallel Uploads)
+# 1. CREATE FUNDRAISER (Async + Background Uploads)
+async def _create_with_documents(db: AsyncSession, fundraiser_dict: dict, spooled: dict):
+    """
+    Saves the campaign straight away and hands the spooled documents
+    (field -> spool file path) to the background media-ingest workers.
+    The *_url columns are filled in as each upload completes.
+    """
+    try:
+        new_fundraiser = FundraiserMaster(**fundraiser_dict)
+        db.add(new_fundraiser)
+        await db.flush()
+        db.add_all(
+            FundraiserDocument(fundraiser_id=new_fundraiser.fundraiser_id, field=field, upload_state="pending")
+            for field in spooled
+        )
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        for path in spooled.values():
+            os.remove(path)
+        raise
+    stats_cache.invalidate()
+
+    for field, path in spooled.items():
+        await media_ingest.enqueue(UploadJob(new_fundraiser.fundraiser_id, field, path))
+
+    logger.info(f"Campaign {new_fundraiser.fundraiser_id} created, {len(spooled)} documents queued for upload")
+    return {
+        "fundraiser_id": new_fundraiser.fundraiser_id,
+        "status": "success",
+        "upload_state": {field: "pending" for field in spooled},
+        "message": "Campaign created successfully, documents are uploading in the background"
+    }
+
+
 @router.post("/", status_code=201)
-async def create_fundraiser(data: FundraiserCreate, db: Session = Depends(get_db)):
+async def create_fundraiser(data: FundraiserCreate, db: AsyncSession = Depends(get_async_db)):
     """
     Creates a new fundraising campaign.
-    Uploads all provided images in parallel to Cloudinary.
+    Documents sent as base64 data URIs are uploaded to Cloudinary in the background;
+    poll GET /fundraiser/{fundraiser_id}/uploads for progress.
     """
-    try:
-        logger.info(f"Received campaign creation request for user {data.user_id}")
-        fundraiser_dict = data.model_dump()
-        image_fields = ["medical_report_url", "hospital_report_url", "id_proof_url", "campaign_image_url"]
-        
-        # Parallel upload logic
-        upload_tasks = []
-        fields_to_upload = []
+    logger.info(f"Received campaign creation request for user {data.user_id}")
+    fundraiser_dict = data.model_dump()
 
-        for field in image_fields:
+    spooled = {}
+    try:
+        for field in DOCUMENT_FIELDS:
             base64_data = fundraiser_dict.get(field)
             if base64_data and base64_data.startswith("data:"):
-                logger.info(f"Preparing to upload {field}...")
-                fields_to_upload.append(field)
-                # Use to_thread to run blocking Cloudinary calls in parallel
-                upload_tasks.append(asyncio.to_thread(cloudinary.uploader.upload, base64_data))
+                spooled[field] = await asyncio.to_thread(spool_data_uri, base64_data)
+                # Critical: remove the Base64 string so we don't store it in the DB
+                fundraiser_dict[field] = None
             else:
                 logger.warning(f"Field {field} is empty or not Base64 data")
+    except HTTPException:
+        for path in spooled.values():
+            os.remove(path)
+        raise
 
-        if upload_tasks:
-            logger.info(f"Starting parallel upload of {len(upload_tasks)} images...")
-            upload_results = await asyncio.gather(*upload_tasks, return_exceptions=True)
-            
-            for field, result in zip(fields_to_upload, upload_results):
-                if isinstance(result, Exception):
-                    logger.error(f"Failed to upload {field}: {str(result)}")
-                    # Critical: remove the Base64 string so we don't store it in the DB
-                    fundraiser_dict[field] = None
-                else:
-                    logger.info(f"Successfully uploaded {field}")
-                    fundraiser_dict[field] = result["secure_url"]
-
-        # Save to database
-        new_fundraiser = FundraiserMaster(**fundraiser_dict)
-        db.add(new_fundraiser)
-        db.commit()
-        db.refresh(new_fundraiser)
-        
-        logger.info(f"Campaign {new_fundraiser.fundraiser_id} created successfully")
-        return {
-            "fundraiser_id": new_fundraiser.fundraiser_id,
-            "status": "success",
-            "message": "Campaign created successfully with parallel image uploads"
-        }
+    try:
+        return await _create_with_documents(db, fundraiser_dict, spooled)
     except Exception as e:
         logger.error(f"Critical error in create_fundraiser: {str(e)}")
-        db.rollback()
+        raise HTTPException(status_code=500, detail=f"Database or Server error: {str(e)}")
+
+
+@router.post("/multipart", status_code=201)
+async def create_fundraiser_multipart(request: Request, db: AsyncSession = Depends(get_async_db)):
+    """
+    Same as POST /fundraiser/ but takes multipart/form-data:
+    the campaign fields as form fields and the documents as file parts
+    named after their *_url field. Files are spooled to disk, not held as base64.
+    """
+    fields, files = await read_document_form(request)
+    try:
+        data = FundraiserCreate(**fields)
+    except ValidationError as e:
+        raise RequestValidationError(e.errors())
+
+    logger.info(f"Received multipart campaign creation request for user {data.user_id}")
+    spooled = {}
+    for field, upload in files.items():
+        spooled[field] = await asyncio.to_thread(spool_upload_file, upload)
+
+    try:
+        return await _create_with_documents(db, data.model_dump(), spooled)
+    except Exception as e:
+        logger.error(f"Critical error in create_fundraiser_multipart: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Database or Server error: {str(e)}")
 
 
 # 2. GET / SEARCH LOGIC
-@router.get("/")
-def get_all_fundraisers(db: Session = Depends(get_db)):
-    """ Returns every fundraiser in the database """
-    return db.query(FundraiserMaster).all()
+async def _list_cards(db: AsyncSession, cursor: int | None, limit: int, status: str | None = None,
+                      category: str | None = None, location: str | None = None, headers: dict | None = None):
+    """
+    Keyset-paginated card listing shared by the list endpoints.
+    Selects only the card columns, so rows come back as plain mappings
+    instead of fully hydrated FundraiserMaster objects, and returns them as a
+    FastJSONResponse (response_model stays on the routes for the API docs).
+    """
+    query = select(
+        FundraiserMaster.fundraiser_id,
+        FundraiserMaster.campaign_title,
+        FundraiserMaster.target_amount,
+        FundraiserMaster.category,
+        FundraiserMaster.location,
+        FundraiserMaster.campaign_image_url,
+        func.coalesce(FundraiserTotals.amount_raised, 0.0).label("raised_amount"),
+    ).outerjoin(FundraiserTotals, FundraiserTotals.fundraiser_id == FundraiserMaster.fundraiser_id)
+    if status:
+        query = query.where(FundraiserMaster.status == status)
+    if category:
+        query = query.where(FundraiserMaster.category == category)
+    if location:
+        query = query.where(FundraiserMaster.location == location)
+    if cursor is not None:
+        query = query.where(FundraiserMaster.fundraiser_id < cursor)
+
+    # Fetch one extra row to know whether another page exists
+    query = query.order_by(FundraiserMaster.fundraiser_id.desc()).limit(limit + 1)
+    rows = (await db.execute(query)).mappings().all()
+    items = rows_to_dicts(rows[:limit])
+    next_cursor = items[-1]["fundraiser_id"] if len(rows) > limit else None
+    return FastJSONResponse({"items": items, "next_cursor": next_cursor}, headers=headers)
+
+
+@router.get("/", response_model=FundraiserPage)
+async def get_all_fundraisers(
+    cursor: int | None = Query(None, description="fundraiser_id of the last item on the previous page"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    status: str | None = None,
+    category: str | None = None,
+    location: str | None = None,
+    cache_headers: dict = Depends(card_list_etag),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Returns one page of campaign cards, newest first.
+    Pass the returned next_cursor back as ?cursor= to fetch the following page.
+    The full record is only served by GET /fundraiser/{fundraiser_id}.
+    Send the returned ETag back as If-None-Match to get a 304 while nothing changed.
+    """
+    return await _list_cards(db, cursor, limit, status=status, category=category, location=location,
+                             headers=cache_headers)
+
+@router.get("/search", response_model=FundraiserSearchPage)
+async def search_fundraisers(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    offset: int = Query(0, ge=0),
+    status: str | None = None,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Ranked full-text search across title, patient, hospital, location and story.
+    Every word is matched as a prefix and all words must match. Pass the returned
+    next_offset back as ?offset= for the following page.
+    """
+    statement, params = build_search(engine.dialect.name, q, status=status)
+    rows = (await db.execute(statement, {**params, "limit": limit + 1, "offset": offset})).mappings().all()
+    items = rows[:limit]
+    return {"items": items, "next_offset": offset + limit if len(rows) > limit else None}
+
+@router.get("/export")
+async def export_fundraisers(
+    format: str = Query("csv", description="csv or ndjson"),
+    start: datetime | None = Query(None, description="Only campaigns whose last donation is on or after this time"),
+    end: datetime | None = Query(None, description="Only campaigns whose last donation is before this time"),
+    fundraiser_id: int | None = None,
+    status: str | None = None,
+):
+    """
+    Streams campaigns with their running totals as CSV or NDJSON for finance reports.
+    Bank details and document URLs are left out of the export.
+    """
+    columns = ["fundraiser_id", "user_id", "campaign_title", "category", "location", "status",
+               "patient_name", "hospital_name", "target_amount", "raised_amount", "donor_count", "last_donation_at"]
+    query = select(
+        *(getattr(FundraiserMaster, column) for column in columns[:9]),
+        func.coalesce(FundraiserTotals.amount_raised, 0).label("raised_amount"),
+        func.coalesce(FundraiserTotals.donor_count, 0).label("donor_count"),
+        FundraiserTotals.last_donation_at,
+    ).outerjoin(FundraiserTotals, FundraiserTotals.fundraiser_id == FundraiserMaster.fundraiser_id)
+    if fundraiser_id is not None:
+        query = query.where(FundraiserMaster.fundraiser_id == fundraiser_id)
+    if status:
+        query = query.where(FundraiserMaster.status == status)
+    if start:
+        query = query.where(FundraiserTotals.last_donation_at >= start)
+    if end:
+        query = query.where(FundraiserTotals.last_donation_at < end)
+    query = query.order_by(FundraiserMaster.fundraiser_id)
+    return export_response(query, columns, format, "fundraisers")
 
 @router.get("/{fundraiser_id}")
-def get_fundraiser_by_id(fundraiser_id: int, db: Session = Depends(get_db)):
+async def get_fundraiser_by_id(fundraiser_id: int, db: AsyncSession = Depends(get_async_db)):
     """ Returns a single fundraiser by its ID """
-    fundraiser = db.query(FundraiserMaster).filter(FundraiserMaster.fundraiser_id == fundraiser_id).first()
+    fundraiser = await db.get(FundraiserMaster, fundraiser_id)
     if not fundraiser:
         raise HTTPException(status_code=404, detail="Fundraiser not found")
-    return fundraiser
+    return FastJSONResponse(serialize_fundraiser(fundraiser))
+
+@router.get("/{fundraiser_id}/uploads")
+async def get_upload_status(fundraiser_id: int, db: AsyncSession = Depends(get_async_db)):
+    """ Reports background upload progress for a campaign's documents """
+    fundraiser = await db.get(FundraiserMaster, fundraiser_id)
+    if not fundraiser:
+        raise HTTPException(status_code=404, detail="Fundraiser not found")
+
+    documents = (
+        await db.execute(select(FundraiserDocument).where(FundraiserDocument.fundraiser_id == fundraiser_id))
+    ).scalars().all()
+    return {
+        "fundraiser_id": fundraiser_id,
+        "complete": all(doc.upload_state in ("done", "failed") for doc in documents),
+        "documents": {
+            doc.field: {
+                "upload_state": doc.upload_state,
+                "attempts": doc.attempts,
+                "url": getattr(fundraiser, doc.field),
+                "error": doc.last_error,
+            }
+            for doc in documents
+        },
+    }
 
 
 
 # 3. STATUS & VERIFICATION LOGIC
-@router.get("/status/pending")
-def get_pending_fundraisers(db: Session = Depends(get_db)):
+@router.get("/status/pending", response_model=FundraiserPage)
+async def get_pending_fundraisers(
+    cursor: int | None = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cache_headers: dict = Depends(card_list_etag),
+    db: AsyncSession = Depends(get_async_db),
+):
     """ Returns campaigns waiting for admin approval """
-    return db.query(FundraiserMaster).filter(FundraiserMaster.status == "pending").all()
+    return await _list_cards(db, cursor, limit, status="pending", headers=cache_headers)
 
-@router.get("/status/approved")
-def get_approved_fundraisers(db: Session = Depends(get_db)):
+@router.get("/status/approved", response_model=FundraiserPage)
+async def get_approved_fundraisers(
+    cursor: int | None = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cache_headers: dict = Depends(card_list_etag),
+    db: AsyncSession = Depends(get_async_db),
+):
     """ Returns only campaigns that are approved and live """
-    return db.query(FundraiserMaster).filter(FundraiserMaster.status == "approved").all()
+    return await _list_cards(db, cursor, limit, status="approved", headers=cache_headers)
 
 @router.patch("/{fundraiser_id}/status")
-def update_status(fundraiser_id: int, status: str, story_text: str | None = None, db: Session = Depends(get_db)):
+async def update_status(fundraiser_id: int, status: str, story_text: str | None = None,
+                        db: AsyncSession = Depends(get_async_db)):
     """
     Admin Action: Approve or Reject a campaign.
     If Approved, the campaign becomes visible on the Home Page.
@@ -111,7 +299,7 @@ def update_status(fundraiser_id: int, status: str, story_text: str | None = None
     if status not in ["approved", "rejected", "pending"]:
         raise HTTPException(status_code=400, detail="Invalid status type")
     
-    fundraiser = db.query(FundraiserMaster).filter(FundraiserMaster.fundraiser_id == fundraiser_id).first()
+    fundraiser = await db.get(FundraiserMaster, fundraiser_id)
     if not fundraiser:
         raise HTTPException(status_code=404, detail="Fundraiser not found")
 
@@ -119,17 +307,28 @@ def update_status(fundraiser_id: int, status: str, story_text: str | None = None
     if story_text: # Allow admin to clean up the story before it goes live
         fundraiser.story_text = story_text
         
-    db.commit()
+    await db.commit()
+    stats_cache.invalidate()
     return {"message": f"Fundraiser is now {status}"}
 
 
 # 4. DELETE & UPDATE
+def _remove_totals(db, fundraiser_id: int):
+    """ Drops the fundraiser from the running totals and the displayed platform total """
+    remove_fundraiser_totals(db, fundraiser_id)
+    sync_platform_funds_raised(db)
+
+
 @router.delete("/{fundraiser_id}")
-def delete_fundraiser(fundraiser_id: int, db: Session = Depends(get_db)):
-    fundraiser = db.query(FundraiserMaster).filter(FundraiserMaster.fundraiser_id == fundraiser_id).first()
+async def delete_fundraiser(fundraiser_id: int, db: AsyncSession = Depends(get_async_db)):
+    fundraiser = await db.get(FundraiserMaster, fundraiser_id)
     if not fundraiser:
         raise HTTPException(status_code=404, detail="Record not found")
     
-    db.delete(fundraiser)
-    db.commit()
+    # Same transaction as the delete, so the platform total never counts a removed campaign
+    await db.run_sync(_remove_totals, fundraiser_id)
+    await db.delete(fundraiser)
+    await db.commit()
+    stats_cache.invalidate()
+    platform_stats_cache.invalidate()
     return {"message": "Success"}
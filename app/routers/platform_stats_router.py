@@ -1,9 +1,11 @@
-from fastapi import APIRouter, Depends
+import os
+from fastapi import APIRouter, Depends, Request, Response
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app.models.platform_stats_model import PlatformStats
-from app.models.donation_model import Donations
-from sqlalchemy import func
+from app.core.donation_totals import get_platform_totals, format_funds_raised
+from app.core.cache import platform_stats_cache
+from app.core.http_cache import make_etag, is_not_modified
 from app.schemas.platform_stats_schema import PlatformStatsCreate, PlatformStatsResponse
 
 router = APIRouter(
@@ -11,35 +13,57 @@ router = APIRouter(
     tags=["Platform Stats"]
 )
 
-@router.get("/", response_model=PlatformStatsResponse)
-def get_platform_stats(db: Session = Depends(get_db)):
-    # Calculate real total from donations
-    total_sum = db.query(func.sum(Donations.amount)).scalar() or 0
-    formatted_total = f"₹{total_sum:,.0f}"
+PLATFORM_STATS_CACHE_KEY = "platform_stats"
+PLATFORM_STATS_MAX_AGE = int(os.getenv("PLATFORM_STATS_MAX_AGE_SECONDS", "60"))
+
+# Shown until an admin saves real figures with PUT /platform-stats
+DEFAULT_STATS = {
+    "lives_impacted": "15,240",
+    "successful_campaigns": "2,847",
+    "success_rate": "98.5%",
+}
 
+def _load_snapshot(db: Session):
     stats = db.query(PlatformStats).first()
-    if not stats:
-        stats = PlatformStats(
-            total_funds_raised=formatted_total,
-            lives_impacted="15,240",
-            successful_campaigns="2,847",
-            success_rate="98.5%"
-        )
-        db.add(stats)
-        db.commit()
-        db.refresh(stats)
+    if stats:
+        data = PlatformStatsResponse.model_validate(stats).model_dump()
     else:
-        # Sync the total just in case
-        stats.total_funds_raised = formatted_total
-        db.commit()
-        
-    return stats
+        # Nothing saved yet: serve the defaults without writing a row from a GET
+        totals = get_platform_totals(db)
+        data = {
+            "id": 0,
+            "total_funds_raised": format_funds_raised(totals.amount_raised if totals else 0),
+            **DEFAULT_STATS,
+        }
+    return data, make_etag(data)
+
+@router.get("/", response_model=PlatformStatsResponse)
+def get_platform_stats(request: Request, response: Response, db: Session = Depends(get_db)):
+    """
+    Read-only: served from a cached snapshot with ETag / Cache-Control,
+    so clients and CDNs can revalidate with If-None-Match.
+    total_funds_raised is kept current by the donation write path.
+    """
+    snapshot = platform_stats_cache.get(PLATFORM_STATS_CACHE_KEY)
+    if snapshot is None:
+        snapshot = _load_snapshot(db)
+        platform_stats_cache.set(PLATFORM_STATS_CACHE_KEY, snapshot)
+    data, etag = snapshot
+
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={PLATFORM_STATS_MAX_AGE}"}
+    if is_not_modified(request, etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return data
 
 @router.put("/", response_model=PlatformStatsResponse)
 def update_platform_stats(stats_in: PlatformStatsCreate, db: Session = Depends(get_db)):
     stats = db.query(PlatformStats).first()
     if not stats:
-        stats = PlatformStats(**stats_in.dict())
+        # We DON'T take total_funds_raised from the input, it's automatic
+        totals = get_platform_totals(db)
+        stats = PlatformStats(**stats_in.model_dump(exclude={"total_funds_raised"}))
+        stats.total_funds_raised = format_funds_raised(totals.amount_raised if totals else 0)
         db.add(stats)
     else:
         # We DON'T update total_funds_raised from the input, it's automatic
@@ -49,4 +73,5 @@ def update_platform_stats(stats_in: PlatformStatsCreate, db: Session = Depends(g
     
     db.commit()
     db.refresh(stats)
+    platform_stats_cache.invalidate()
     return stats
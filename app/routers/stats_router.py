@@ -1,29 +1,139 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from sqlalchemy import func
-from app.database import get_db
+from datetime import date, datetime, timedelta
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func
+from app.database import get_async_db, pool_status
 from app.models.fundraiser_model import FundraiserMaster
-from app.models.donation_model import Donations
+from app.models.donation_totals_model import PlatformTotals
+from app.models.donation_rollup_model import DonationRollup
+from app.core.cache import stats_cache, upload_digest_cache
+from app.core.donation_totals import PLATFORM_ROW_ID
+from app.core.donation_rollups import GRANULARITIES, bucket_start
+from app.core.upload_executor import upload_executor
+from app.core.media_ingest import media_ingest
+from app.core.image_processing import preprocess_stats
 
 router = APIRouter(prefix="/stats", tags=["Statistics"])
 
+STATS_CACHE_KEY = "admin_stats"
+
+# Dimensions GET /stats/donations/timeseries can split a series by
+TIMESERIES_GROUPS = {
+    "category": FundraiserMaster.category,
+    "payment_method": DonationRollup.payment_method,
+    "fundraiser": DonationRollup.fundraiser_id,
+}
+
 @router.get("/")
 @router.get("")
-def get_stats(db: Session = Depends(get_db)):
+async def get_stats(db: AsyncSession = Depends(get_async_db)):
     # Calculate statistics for the Admin Dashboard
-    # Count how many fundraisers are total vs approved vs pending
-    total_fundraisers = db.query(FundraiserMaster).count()
-    verified_fundraisers = db.query(FundraiserMaster).filter(FundraiserMaster.status == "approved").count()
-    pending_fundraisers = db.query(FundraiserMaster).filter(FundraiserMaster.status == "pending").count()
-    
-    # Calculate Total Donations collected across the entire platform
-    total_donations = db.query(func.sum(Donations.amount)).scalar() or 0
-    
-    print(f"DEBUG Stats: F={total_fundraisers}, V={verified_fundraisers}, P={pending_fundraisers}, D={total_donations}")
-    
+    cached = stats_cache.get(STATS_CACHE_KEY)
+    if cached is not None:
+        return cached
+
+    # One round trip: fundraiser counts per status plus the running donation total
+    total_donations = (
+        select(PlatformTotals.amount_raised)
+        .where(PlatformTotals.id == PLATFORM_ROW_ID)
+        .scalar_subquery()
+    )
+    row = (await db.execute(
+        select(
+            func.count(FundraiserMaster.fundraiser_id),
+            func.count(FundraiserMaster.fundraiser_id).filter(FundraiserMaster.status == "approved"),
+            func.count(FundraiserMaster.fundraiser_id).filter(FundraiserMaster.status == "pending"),
+            total_donations,
+        )
+    )).one()
+
+    stats = {
+        "total_fundraisers": row[0],
+        "verified_fundraisers": row[1],
+        "pending_fundraisers": row[2],
+        "total_donations": row[3] or 0
+    }
+    stats_cache.set(STATS_CACHE_KEY, stats)
+    return stats
+
+@router.get("/donations/timeseries")
+async def get_donation_timeseries(
+    granularity: str = Query("day", description="day, week or month"),
+    start: date | None = Query(None, description="First day to include (default: one year before end)"),
+    end: date | None = Query(None, description="Last day to include (default: today, UTC)"),
+    group_by: str | None = Query(None, description="category, payment_method or fundraiser"),
+    fundraiser_id: int | None = None,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Donation count and amount per time bucket, optionally split by category,
+    payment method or fundraiser. Served from the donation_rollups table, so the
+    cost depends on the number of buckets, not the number of donations.
+    Buckets are UTC; weeks start on Monday.
+    """
+    if granularity not in GRANULARITIES:
+        raise HTTPException(status_code=400, detail=f"granularity must be one of {', '.join(GRANULARITIES)}")
+    if group_by is not None and group_by not in TIMESERIES_GROUPS:
+        raise HTTPException(status_code=400, detail=f"group_by must be one of {', '.join(TIMESERIES_GROUPS)}")
+    # Buckets are UTC, so "today" is too
+    end = end or datetime.utcnow().date()
+    start = start or end - timedelta(days=365)
+    if start > end:
+        raise HTTPException(status_code=400, detail="start must not be after end")
+
+    columns = [DonationRollup.bucket_start]
+    if group_by:
+        columns.append(TIMESERIES_GROUPS[group_by].label("key"))
+    query = (
+        select(
+            *columns,
+            func.sum(DonationRollup.donation_count).label("count"),
+            func.sum(DonationRollup.amount).label("amount"),
+        )
+        .where(
+            DonationRollup.granularity == granularity,
+            DonationRollup.bucket_start >= bucket_start(start, granularity),
+            DonationRollup.bucket_start <= end,
+        )
+        .group_by(*columns)
+        .order_by(*columns)
+    )
+    if group_by == "category":
+        query = query.join(FundraiserMaster, FundraiserMaster.fundraiser_id == DonationRollup.fundraiser_id)
+    if fundraiser_id is not None:
+        query = query.where(DonationRollup.fundraiser_id == fundraiser_id)
+
+    rows = (await db.execute(query)).mappings().all()
+    return {
+        "granularity": granularity,
+        "start": bucket_start(start, granularity),
+        "end": end,
+        "group_by": group_by,
+        "points": [
+            {"bucket": row["bucket_start"], **({"key": row["key"]} if group_by else {}),
+             "count": row["count"], "amount": row["amount"]}
+            for row in rows
+        ],
+    }
+
+@router.get("/cache")
+def get_stats_cache_info():
+    """ Hit/miss counters for the admin stats cache """
+    return stats_cache.stats()
+
+@router.get("/uploads")
+def get_upload_metrics():
+    """ Upload executor and media-ingest queue metrics """
     return {
-        "total_fundraisers": total_fundraisers,
-        "verified_fundraisers": verified_fundraisers,
-        "pending_fundraisers": pending_fundraisers,
-        "total_donations": total_donations
+        **upload_executor.metrics.snapshot(),
+        "pool_size": upload_executor.pool_size,
+        "max_in_flight": upload_executor.max_in_flight,
+        "ingest_queue_depth": media_ingest.depth(),
+        "digest_cache": upload_digest_cache.stats(),
+        "image_preprocessing": preprocess_stats.snapshot(),
     }
+
+@router.get("/db-pool")
+def get_db_pool_metrics():
+    """ Connection pool utilization and checkout wait times """
+    return pool_status()
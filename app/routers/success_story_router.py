@@ -1,9 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
 from typing import List
 from app.database import get_db
 from app.models.success_story_model import SuccessStory
 from app.schemas.success_story_schema import SuccessStoryCreate, SuccessStoryResponse
+from app.core.http_cache import table_etag
 
 router = APIRouter(
     prefix="/success-stories",
@@ -11,7 +12,10 @@ router = APIRouter(
 )
 
 @router.get("/", response_model=List[SuccessStoryResponse])
-def get_stories(db: Session = Depends(get_db)):
+def get_stories(response: Response, cache_headers: dict = Depends(table_etag("success_stories")),
+                db: Session = Depends(get_db)):
+    """ ETag'd: If-None-Match gets a 304 without touching the database while no story changed """
+    response.headers.update(cache_headers)
     return db.query(SuccessStory).all()
 
 @router.post("/", response_model=SuccessStoryResponse)
@@ -1,22 +1,31 @@
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from app.database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_db, get_async_db
 from app.models.user_model import User
+from app.models.fundraiser_model import FundraiserMaster
 from app.schemas.users_schema import UserCreate, UserLogin, UserResponse
-from app.core.auth import get_password_hash, verify_password, create_access_token, get_current_user
+from app.core.auth import get_password_hash_async, verify_password_async, create_access_token, get_current_user
+from app.core.cache import user_cache, stats_cache, platform_stats_cache
+from app.core.donation_totals import remove_fundraiser_totals, remove_donor_totals, sync_platform_funds_raised
+from app.core.donation_rollups import remove_donor_rollups
+from app.core.serializers import FastJSONResponse, serialize_user, rows_to_dicts
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
 # 1. USER REGISTRATION
 @router.post("/", response_model=UserResponse)
-def register_user(data: UserCreate, db: Session = Depends(get_db)):
+async def register_user(data: UserCreate, db: AsyncSession = Depends(get_async_db)):
     # 1. Register a new user
     # Check if phone number already exists to prevent duplicates
-    if db.query(User).filter(User.phone_number == data.phone_number).first():
+    existing = await db.execute(select(User.user_id).where(User.phone_number == data.phone_number))
+    if existing.first():
         raise HTTPException(status_code=400, detail="Phone number already registered")
         
     # Security: Hash the password (encrypt it) so it's not stored as plain text
-    hashed_pass = get_password_hash(data.password)
+    # Awaited on the bcrypt pool, so no threadpool thread waits on it
+    hashed_pass = await get_password_hash_async(data.password)
     
     new_user = User(
         fullname=data.fullname,
@@ -25,24 +34,25 @@ def register_user(data: UserCreate, db: Session = Depends(get_db)):
     )
     
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+    await db.refresh(new_user)
     return new_user
 
 
 # 2. USER LOGIN (JWT Tracking)
 @router.post("/login")
-def login(data: UserLogin, db: Session = Depends(get_db)):
+async def login(data: UserLogin, db: AsyncSession = Depends(get_async_db)):
     # Find user by phone
-    user = db.query(User).filter(User.phone_number == data.phone_number).first()
+    user = (await db.execute(select(User).where(User.phone_number == data.phone_number))).scalars().first()
     
     # Verify both user existence and password match
-    if not user or not verify_password(data.password, user.password):
+    if not user or not await verify_password_async(data.password, user.password):
         raise HTTPException(status_code=401, detail="Incorrect phone number or password")
     
     # Create a secure JWT Access Token
     # This token allows the user to stay logged in without sending password again
-    token = create_access_token(data={"sub": str(user.phone_number)})
+    # user_id / role claims let get_current_user skip the users table on cache hits
+    token = create_access_token(data={"sub": str(user.phone_number), "user_id": user.user_id, "role": user.role})
     
     return {
         "access_token": token,
@@ -57,38 +67,58 @@ def login(data: UserLogin, db: Session = Depends(get_db)):
 @router.get("/me", response_model=UserResponse)
 def get_current_profile(current_user: User = Depends(get_current_user)):
     """ Returns profile of whichever user is logged in """
-    return current_user
+    return FastJSONResponse(serialize_user(current_user))
 
 @router.get("/", response_model=list[UserResponse])
 def list_all_users(db: Session = Depends(get_db)):
     """ Simple list of all registered users (Admin only ideally) """
-    return db.query(User).all()
+    columns = [getattr(User, field) for field in serialize_user.fields]
+    return FastJSONResponse(rows_to_dicts(db.execute(select(*columns)).mappings()))
 
 
 # 4. ACCOUNT MANAGEMENT
 @router.put("/{user_id}")
-def update_profile(user_id: int, data: UserCreate, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.user_id == user_id).first()
+async def update_profile(user_id: int, data: UserCreate, db: AsyncSession = Depends(get_async_db)):
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
     user_data = data.model_dump()
     # Update password only if a new one is provided
     if "password" in user_data:
-        user_data["password"] = get_password_hash(user_data["password"])
+        user_data["password"] = await get_password_hash_async(user_data["password"])
 
     for key, value in user_data.items():
         setattr(user, key, value)
     
-    db.commit()
+    await db.commit()
+    user_cache.invalidate(user_id)
     return {"message": "Update successful"}
 
+def _remove_user_totals(db: Session, user_id: int):
+    """ Takes the user's campaigns and donations, which cascade away with them, out of the totals and rollups """
+    own_fundraisers = sorted(
+        fundraiser_id for (fundraiser_id,) in
+        db.query(FundraiserMaster.fundraiser_id).filter(FundraiserMaster.user_id == user_id)
+    )
+    for fundraiser_id in own_fundraisers:
+        remove_fundraiser_totals(db, fundraiser_id)
+    remove_donor_totals(db, user_id, own_fundraisers)
+    remove_donor_rollups(db, user_id, own_fundraisers)
+    sync_platform_funds_raised(db)
+
+
 @router.delete("/{user_id}")
 def delete_profile(user_id: int, db: Session = Depends(get_db)):
     user = db.query(User).filter(User.user_id == user_id).first()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
+    # Same transaction as the delete, so the totals never count what the cascade removed
+    _remove_user_totals(db, user_id)
     db.delete(user)
     db.commit()
+    user_cache.invalidate(user_id)
+    stats_cache.invalidate()
+    platform_stats_cache.invalidate()
     return {"message": "User deleted successfully"}
@@ -1,4 +1,5 @@
-from pydantic import BaseModel
+from datetime import datetime, timezone
+from pydantic import BaseModel, field_validator
 
 
 class DonationCreate(BaseModel):
@@ -9,5 +10,14 @@ class DonationCreate(BaseModel):
     payment_method: str
 
 
+class DonationBulkRow(DonationCreate):
+    """ One row of POST /donations/bulk; settlement files carry their own dates """
+    donation_date: datetime | None = None
 
-    
\ No newline at end of file
+    @field_validator('donation_date')
+    @classmethod
+    def convert_to_naive_utc(cls, v):
+        # donation_date is stored as naive UTC; offsets in the file are converted, not dropped
+        if v is not None and v.tzinfo is not None:
+            return v.astimezone(timezone.utc).replace(tzinfo=None)
+        return v
@@ -28,3 +28,28 @@ class UploadImage(BaseModel):
     hospital_report_url : str | None = None
     id_proof_url : str | None = None
     campaign_image_url : str | None = None
+
+
+class FundraiserCard(BaseModel):
+    """ Lightweight shape used by the campaign list views """
+    fundraiser_id : int
+    campaign_title : str
+    target_amount : float
+    category : str
+    location : str
+    campaign_image_url : str | None = None
+    raised_amount : float = 0
+
+
+class FundraiserPage(BaseModel):
+    items : list[FundraiserCard]
+    next_cursor : int | None = None
+
+
+class FundraiserSearchResult(FundraiserCard):
+    rank : float
+
+
+class FundraiserSearchPage(BaseModel):
+    items : list[FundraiserSearchResult]
+    next_offset : int | None = None
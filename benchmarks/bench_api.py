@@ -0,0 +1,417 @@
+"""
+Load test for the API's hot paths, run in-process against a seeded database.
+
+Seeds a SQLite file (or --db-url) at a configurable scale, stubs Cloudinary
+with a fixed-latency fake, and drives the ASGI app with concurrent httpx
+clients over ASGITransport. For every scenario it reports throughput and
+p50/p95/p99 latency of the successful responses; error responses (e.g. 429s
+from the bcrypt limiter) are counted separately by status and left out of
+both, so a run that rejects more requests never looks faster:
+
+    python benchmarks/bench_api.py                                   # 10k campaigns, 1M donations
+    python benchmarks/bench_api.py --campaigns 1000 --donations 50000 --requests 500
+    python benchmarks/bench_api.py --scenarios list,detail,stats
+    python benchmarks/bench_api.py --save-baseline benchmarks/baseline.json
+    python benchmarks/bench_api.py --compare benchmarks/baseline.json --tolerance 15
+
+By default the seeded SQLite database is cached under benchmarks/.data per
+scale, seed and --bcrypt-rounds, and every run works on a fresh copy of it, so write scenarios
+don't drift the fixture and a 1M-donation seed is only paid once (--reseed
+rebuilds it). With --db-url the target database is wiped and reseeded
+whenever its row counts or password hash cost don't match the request. --compare exits with
+status 1 when any scenario's p95 or throughput regresses by more than
+--tolerance percent, so it can gate CI. Baselines are only comparable on
+the same machine, database and scale; the scale is stored with them.
+
+Scenarios: list, detail, search, login, donation_create, stats, campaign_create.
+campaign_create posts multipart campaigns with an image; its latency is the
+API response, and the time the background ingest queue needs to finish the
+stubbed uploads is reported separately as ingest_drain_seconds.
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(ROOT, "benchmarks", ".data")
+RUN_DB = os.path.join(DATA_DIR, "run.db")
+SCENARIOS = ("list", "detail", "search", "login", "donation_create", "stats", "campaign_create")
+WRITE_SCENARIOS = ("login", "donation_create", "campaign_create")
+BENCH_PASSWORD = "bench-password"
+SEED_BATCH = 10000
+
+CATEGORIES = ["Medical", "Education", "Disaster Relief", "Animal Welfare", "Community"]
+CITIES = ["Chennai", "Mumbai", "Delhi", "Bengaluru", "Kolkata", "Hyderabad", "Pune", "Jaipur"]
+HOSPITALS = ["Apollo Hospitals", "AIIMS", "Fortis", "Manipal Hospital", "CMC Vellore", "Narayana Health"]
+WORDS = ["surgery", "treatment", "kidney", "transplant", "cancer", "therapy", "accident", "school", "flood", "heart"]
+PAYMENT_METHODS = ["UPI", "GPay", "PhonePay", "BankTransfer"]
+
+
+def _percentile(samples, pct):
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def _ms(seconds):
+    return round(seconds * 1000, 2) if seconds is not None else None
+
+
+def _fixture_path(args) -> str:
+    # The seeded password hashes bake in the bcrypt cost, so it is part of the fixture's identity
+    return os.path.join(DATA_DIR, f"fixture-{args.users}-{args.campaigns}-{args.donations}-{args.seed}"
+                                  f"-r{args.bcrypt_rounds}.db")
+
+
+def _configure_env(args):
+    """ Must run before anything imports app.* """
+    if not args.db_url:
+        os.makedirs(DATA_DIR, exist_ok=True)
+        if os.path.exists(RUN_DB):
+            os.remove(RUN_DB)
+        fixture = _fixture_path(args)
+        if os.path.exists(fixture) and not args.reseed:
+            shutil.copyfile(fixture, RUN_DB)
+    os.environ["DB_URL"] = args.db_url or f"sqlite:///{RUN_DB}"
+    os.environ["DB_ASYNC"] = "true" if args.db_async else "false"
+    os.environ.setdefault("LOG_SAMPLE_RATE", "0")
+    # Logins are bcrypt-bound; keep the cost configurable rather than pinned to production rounds
+    os.environ["BCRYPT_ROUNDS"] = str(args.bcrypt_rounds)
+    # Let every client queue for the bcrypt pool instead of being turned away with 429
+    os.environ.setdefault("PASSWORD_MAX_CONCURRENCY", str(args.concurrency))
+    for name in ("CLOUDINARY_CLOUD_NAME", "CLOUDINARY_API_KEY", "CLOUDINARY_API_SECRET"):
+        os.environ.setdefault(name, "bench")
+    sys.path.insert(0, ROOT)
+
+
+def _stub_cloudinary(latency_ms: float):
+    """ Replaces the Cloudinary upload call with a fixed-latency fake """
+    import cloudinary.uploader
+
+    counter = iter(range(1, 1 << 62))
+
+    def fake_upload(source, **kwargs):
+        if hasattr(source, "read"):
+            source.read()
+        time.sleep(latency_ms / 1000)
+        return {"secure_url": f"https://res.cloudinary.test/bench/{next(counter)}.webp"}
+
+    cloudinary.uploader.upload = fake_upload
+
+
+def seed(args):
+    """ Creates the schema and fills it at the requested scale, unless it already matches """
+    import logging
+    from datetime import datetime, timedelta
+    from sqlalchemy import func, insert, select
+    from app import migrations
+    from app.database import Base, engine, sessionLocal
+    from app.core.auth import get_password_hash
+    from app.core.donation_rollups import rebuild_rollups
+    from app.core.donation_totals import rebuild_totals
+    from app.models.donation_model import Donations
+    from app.models.fundraiser_model import FundraiserMaster
+    from app.models.platform_stats_model import PlatformStats
+    from app.models.user_model import User
+    from app.migrations import _import_models
+
+    logging.getLogger("sqlalchemy").setLevel(logging.WARNING)
+    migrations.upgrade(engine, log=lambda msg: None)
+
+    db = sessionLocal()
+    try:
+        counts = (
+            db.scalar(select(func.count()).select_from(User)),
+            db.scalar(select(func.count()).select_from(FundraiserMaster)),
+            db.scalar(select(func.count()).select_from(Donations)),
+        )
+        # bcrypt hashes look like $2b$<rounds>$...; hashes of another cost mean another fixture
+        sample_hash = db.scalar(select(User.password).limit(1)) or ""
+        hash_rounds = sample_hash.split("$")[2] if sample_hash.count("$") >= 3 else None
+        if (counts == (args.users, args.campaigns, args.donations) and hash_rounds == f"{args.bcrypt_rounds:02d}"
+                and not args.reseed):
+            print(f"[OK] Reusing seeded database ({args.users} users, {args.campaigns} campaigns, "
+                  f"{args.donations} donations)")
+            return
+        if any(counts):
+            # Children first: SQLite doesn't enforce the ON DELETE CASCADEs
+            _import_models()
+            for table in reversed(Base.metadata.sorted_tables):
+                db.execute(table.delete())
+            db.commit()
+
+        rng = random.Random(args.seed)
+        started = time.perf_counter()
+        password = get_password_hash(BENCH_PASSWORD)
+        db.execute(insert(User), [
+            {"user_id": i, "fullname": f"Bench User {i}", "phone_number": f"9{i:09d}", "password": password, "role": "user"}
+            for i in range(1, args.users + 1)
+        ])
+
+        for offset in range(0, args.campaigns, SEED_BATCH):
+            rows = []
+            for i in range(offset + 1, min(offset + SEED_BATCH, args.campaigns) + 1):
+                words = rng.sample(WORDS, 3)
+                rows.append({
+                    "fundraiser_id": i, "user_id": rng.randint(1, args.users),
+                    "campaign_title": f"Help for {words[0]} {words[1]} #{i}",
+                    "target_amount": rng.choice([50000, 100000, 250000, 500000, 1000000]),
+                    "category": rng.choice(CATEGORIES), "location": rng.choice(CITIES),
+                    "patient_name": f"Patient {i}", "patient_age": rng.randint(1, 90), "patient_relation": "Self",
+                    "hospital_name": rng.choice(HOSPITALS), "story_text": " ".join(rng.choices(WORDS, k=60)),
+                    "campaign_image_url": f"https://res.cloudinary.test/seed/{i}.webp",
+                    "bank_account_number": f"{i:012d}", "ifsc_code": "BENC0000001", "agreed_terms": True,
+                    "status": "approved" if rng.random() < 0.7 else "pending",
+                })
+            db.execute(insert(FundraiserMaster), rows)
+
+        start_date = datetime.utcnow() - timedelta(days=365)
+        for offset in range(0, args.donations, SEED_BATCH):
+            db.execute(insert(Donations), [
+                {
+                    "user_id": rng.randint(1, args.users) if rng.random() < 0.6 else None,
+                    "fundraiser_id": rng.randint(1, args.campaigns), "donor_name": "Bench Donor",
+                    "amount": float(rng.choice([100, 250, 500, 1000, 2000, 5000])),
+                    "payment_method": rng.choice(PAYMENT_METHODS),
+                    "donation_date": start_date + timedelta(seconds=rng.randint(0, 365 * 86400)),
+                }
+                for _ in range(min(SEED_BATCH, args.donations - offset))
+            ])
+        db.add(PlatformStats())
+        db.flush()
+        rebuild_totals(db)
+        rebuild_rollups(db)
+        db.commit()
+        if not args.db_url:
+            engine.dispose()
+            shutil.copyfile(RUN_DB, _fixture_path(args))
+        print(f"[SUCCESS] Seeded {args.users} users, {args.campaigns} campaigns and {args.donations} donations "
+              f"in {time.perf_counter() - started:.1f}s")
+    finally:
+        db.close()
+
+
+def _sample_image() -> bytes:
+    try:
+        from PIL import Image
+    except ImportError:
+        return b"\x89PNG\r\n\x1a\n" + os.urandom(20000)
+    buffer = io.BytesIO()
+    Image.new("RGB", (2400, 1800), (200, 80, 60)).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def build_scenarios(args):
+    """ name -> async fn(client, rng) issuing one request """
+    image = _sample_image()
+    campaign_fields = {
+        "user_id": "1", "campaign_title": "Bench campaign", "target_amount": "100000", "category": "Medical",
+        "location": "Chennai", "patient_name": "Bench Patient", "patient_age": "30", "patient_relation": "Self",
+        "hospital_name": "Apollo Hospitals", "story_text": "Benchmark story " * 20,
+        "bank_account_number": "000000000000", "ifsc_code": "BENC0000001", "agreed_terms": "true",
+    }
+
+    async def list_page(client, rng):
+        cursor = rng.randint(args.campaigns // 2, args.campaigns + 1)
+        return await client.get(f"/fundraiser/?limit=20&cursor={cursor}")
+
+    async def detail(client, rng):
+        return await client.get(f"/fundraiser/{rng.randint(1, args.campaigns)}")
+
+    async def search(client, rng):
+        return await client.get(f"/fundraiser/search?q={rng.choice(WORDS)[:4]}&limit=20")
+
+    async def login(client, rng):
+        phone = f"9{rng.randint(1, args.users):09d}"
+        return await client.post("/users/login", json={"phone_number": phone, "password": BENCH_PASSWORD})
+
+    async def donation_create(client, rng):
+        return await client.post("/donations/", json={
+            "fundraiser_id": rng.randint(1, args.campaigns), "donor_name": "Bench Donor",
+            "amount": float(rng.choice([100, 500, 1000])), "payment_method": rng.choice(PAYMENT_METHODS),
+        })
+
+    async def stats(client, rng):
+        return await client.get("/stats/")
+
+    async def campaign_create(client, rng):
+        # Unique bytes per request so the upload digest cache doesn't turn every upload into a hit
+        files = {"campaign_image_url": ("photo.png", image + os.urandom(16), "image/png")}
+        return await client.post("/fundraiser/multipart", data=campaign_fields, files=files)
+
+    return {
+        "list": list_page, "detail": detail, "search": search, "login": login,
+        "donation_create": donation_create, "stats": stats, "campaign_create": campaign_create,
+    }
+
+
+async def drive(app, scenario, concurrency: int, total: int, seed: int):
+    import httpx
+
+    latencies = []
+    error_statuses = {}
+    counter = iter(range(total))
+
+    async def client_loop(client, worker):
+        rng = random.Random(seed * 1000 + worker)
+        for _ in counter:
+            start = time.perf_counter()
+            response = await scenario(client, rng)
+            elapsed = time.perf_counter() - start
+            if response.status_code >= 400:
+                error_statuses[str(response.status_code)] = error_statuses.get(str(response.status_code), 0) + 1
+            else:
+                latencies.append(elapsed)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(client_loop(client, worker) for worker in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    # Throughput and latency cover successful responses only
+    return {
+        "requests": total,
+        "ok": len(latencies),
+        "errors": sum(error_statuses.values()),
+        "error_statuses": error_statuses,
+        "seconds": round(elapsed, 3),
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": _ms(_percentile(latencies, 50)),
+        "p95_ms": _ms(_percentile(latencies, 95)),
+        "p99_ms": _ms(_percentile(latencies, 99)),
+        "mean_ms": _ms(statistics.mean(latencies)) if latencies else None,
+    }
+
+
+async def run(args, names):
+    from app.main import app
+    from app.core.media_ingest import media_ingest
+
+    scenarios = build_scenarios(args)
+    results = {}
+    for name in names:
+        requests = args.write_requests if name in WRITE_SCENARIOS else args.requests
+        # Warm-up: imports, caches, pool connections
+        await drive(app, scenarios[name], min(args.concurrency, 4), min(requests, 20), args.seed + 1)
+        await media_ingest.join()
+        result = await drive(app, scenarios[name], args.concurrency, requests, args.seed)
+        if name == "campaign_create":
+            drain_start = time.perf_counter()
+            await media_ingest.join()
+            result["ingest_drain_seconds"] = round(time.perf_counter() - drain_start, 3)
+        results[name] = result
+        if result["errors"]:
+            print(f"[WARNING] {name}: {result['errors']} of {result['requests']} requests failed {result['error_statuses']}")
+        print(f"[OK] {name}: {result['rps']} req/s, p95 {result['p95_ms']} ms")
+    return results
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """ Human-readable regressions: more failed requests, or p95 up / throughput down by more than tolerance percent """
+    regressions = []
+    for name, current in results.items():
+        before = baseline.get("results", {}).get(name)
+        if not before:
+            continue
+        if current["errors"] > before.get("errors", 0):
+            regressions.append(f"{name}: failed requests {before.get('errors', 0)} -> {current['errors']}")
+        if current["p95_ms"] is None or not before.get("p95_ms"):
+            continue
+        if current["p95_ms"] > before["p95_ms"] * (1 + tolerance / 100):
+            regressions.append(f"{name}: p95 {before['p95_ms']} -> {current['p95_ms']} ms")
+        if current["rps"] < before["rps"] * (1 - tolerance / 100):
+            regressions.append(f"{name}: throughput {before['rps']} -> {current['rps']} req/s")
+    return regressions
+
+
+def print_table(results: dict, baseline: dict | None):
+    header = f"{'scenario':<16} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}"
+    if baseline:
+        header += f" {'p95 Δ%':>8} {'req/s Δ%':>9}"
+    print("\n" + header)
+    for name, r in results.items():
+        line = (f"{name:<16} {r['rps']:>9} {str(r['p50_ms']):>8} {str(r['p95_ms']):>8} {str(r['p99_ms']):>8} "
+                f"{r['errors']:>7}")
+        before = (baseline or {}).get("results", {}).get(name)
+        if before and r["p95_ms"] and before.get("p95_ms") and before.get("rps"):
+            line += f" {(r['p95_ms'] / before['p95_ms'] - 1) * 100:>+8.1f} {(r['rps'] / before['rps'] - 1) * 100:>+9.1f}"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db-url", help="defaults to a SQLite file under benchmarks/.data")
+    parser.add_argument("--db-async", action="store_true", help="run with DB_ASYNC=true")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--campaigns", type=int, default=10000)
+    parser.add_argument("--donations", type=int, default=1000000)
+    parser.add_argument("--reseed", action="store_true", help="rebuild the fixture even if its size matches")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=2000, help="requests per read scenario")
+    parser.add_argument("--write-requests", type=int, default=300,
+                        help="requests per write scenario (login, donation_create, campaign_create)")
+    parser.add_argument("--upload-latency-ms", type=float, default=150, help="latency of the stubbed Cloudinary upload")
+    parser.add_argument("--bcrypt-rounds", type=int, default=12)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--save-baseline", metavar="PATH")
+    parser.add_argument("--compare", metavar="PATH")
+    parser.add_argument("--tolerance", type=float, default=10.0, help="allowed regression in percent")
+    args = parser.parse_args()
+
+    names = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = set(names) - set(SCENARIOS)
+    if unknown:
+        sys.exit(f"[ERROR] Unknown scenarios: {', '.join(sorted(unknown))}")
+
+    _configure_env(args)
+    _stub_cloudinary(args.upload_latency_ms)
+    seed(args)
+    results = asyncio.run(run(args, names))
+
+    config = {
+        "python": platform.python_version(), "machine": platform.machine(),
+        "db": os.environ["DB_URL"].split(":", 1)[0], "db_async": args.db_async,
+        "users": args.users, "campaigns": args.campaigns, "donations": args.donations,
+        "concurrency": args.concurrency, "upload_latency_ms": args.upload_latency_ms,
+        "bcrypt_rounds": args.bcrypt_rounds,
+        "password_max_concurrency": int(os.environ["PASSWORD_MAX_CONCURRENCY"]),
+    }
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        mismatched = {key: (baseline.get("config", {}).get(key), value) for key, value in config.items()
+                      if baseline.get("config", {}).get(key) != value}
+        if mismatched:
+            print(f"[WARNING] Baseline was recorded with a different setup: {mismatched}")
+
+    print_table(results, baseline)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump({"config": config, "results": results}, f, indent=2, sort_keys=True)
+        print(f"\n[SUCCESS] Baseline written to {args.save_baseline}")
+
+    if baseline:
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\n[ERROR] Regressions beyond {args.tolerance}%:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print(f"\n[DONE] No regressions beyond {args.tolerance}%")
+
+
+if __name__ == "__main__":
+    main()
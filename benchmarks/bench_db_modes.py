@@ -0,0 +1,120 @@
+"""
+Throughput of the sync (ThreadedSession) vs async (AsyncEngine) database path.
+
+Runs the app in-process once per mode (DB_ASYNC=false / true) and drives it
+with concurrent httpx clients over ASGITransport:
+
+    python benchmarks/bench_db_modes.py --concurrency 200 --requests 5000
+
+Defaults to a throwaway SQLite file (needs aiosqlite for the async run);
+pass --db-url postgresql://... to measure against a real server, where the
+difference is much larger because queries actually wait on the network.
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def _drive(app, paths, concurrency, total):
+    import httpx
+
+    latencies = []
+    counter = iter(range(total))
+
+    async def client_loop(client):
+        for i in counter:
+            start = time.perf_counter()
+            response = await client.get(paths[i % len(paths)])
+            response.raise_for_status()
+            latencies.append(time.perf_counter() - start)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(client_loop(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    return {
+        "requests": len(latencies),
+        "seconds": round(elapsed, 3),
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(_percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(_percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(_percentile(latencies, 99) * 1000, 2),
+        "mean_ms": round(statistics.mean(latencies) * 1000, 2),
+    }
+
+
+def run_mode(args):
+    """ Child process: seed, then benchmark with whatever DB_ASYNC is set """
+    sys.path.insert(0, ROOT)
+    from app.main import app
+    from app import migrations
+    from app.database import engine, sessionLocal
+    from app.models.fundraiser_model import FundraiserMaster
+
+    migrations.upgrade(engine, log=lambda msg: None)
+    db = sessionLocal()
+    if db.query(FundraiserMaster).count() == 0:
+        db.add_all(
+            FundraiserMaster(
+                user_id=1, campaign_title=f"Campaign {i}", target_amount=100000, category="Medical",
+                location="Chennai", patient_name="Patient", patient_age=30, patient_relation="Self",
+                hospital_name="Hospital", story_text="Story " * 50, bank_account_number="0000",
+                ifsc_code="IFSC0000", agreed_terms=True, status="approved" if i % 2 else "pending",
+            )
+            for i in range(args.fundraisers)
+        )
+        db.commit()
+    db.close()
+
+    paths = ["/fundraiser/?limit=20", "/fundraiser/status/approved?limit=20"]
+    paths += [f"/fundraiser/{i}" for i in range(1, min(args.fundraisers, 50) + 1)]
+    result = asyncio.run(_drive(app, paths, args.concurrency, args.requests))
+    result["mode"] = "async" if os.environ.get("DB_ASYNC") == "true" else "sync"
+    print(json.dumps(result))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db-url")
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--fundraisers", type=int, default=1000)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_mode(args)
+        return
+
+    db_url = args.db_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+    child_args = [sys.executable, __file__, "--child", "--concurrency", str(args.concurrency),
+                  "--requests", str(args.requests), "--fundraisers", str(args.fundraisers)]
+    results = []
+    for mode in ("false", "true"):
+        env = dict(os.environ, DB_URL=db_url, DB_ASYNC=mode)
+        proc = subprocess.run(child_args, env=env, capture_output=True, text=True)
+        if proc.returncode:
+            sys.exit(f"DB_ASYNC={mode} run failed:\n{proc.stderr[-4000:]}")
+        results.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+
+    print(f"{'mode':<6} {'rps':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for r in results:
+        print(f"{r['mode']:<6} {r['rps']:>9} {r['p50_ms']:>8} {r['p95_ms']:>8} {r['p99_ms']:>8}")
+
+
+if __name__ == "__main__":
+    main()
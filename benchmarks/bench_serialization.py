@@ -0,0 +1,86 @@
+"""
+Rows/sec serialized: FastAPI's default path vs the serializers in app/core/serializers.py.
+
+"before" is what an endpoint returning ORM objects costs: jsonable_encoder
+over every object followed by JSONResponse's json.dumps. "after" is a
+serializer building plain dicts plus FastJSONResponse (orjson when
+installed). No database is involved; the objects are built in memory:
+
+    python benchmarks/bench_serialization.py --rows 20000 --repeat 5
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def build_rows(count: int):
+    from app.models.donation_model import Donations
+    from app.models.fundraiser_model import FundraiserMaster
+    from app.models.user_model import User
+
+    now = datetime.utcnow()
+    fundraisers = [
+        FundraiserMaster(
+            fundraiser_id=i, user_id=i % 500 + 1, campaign_title=f"Help for surgery #{i}", target_amount=250000.0,
+            category="Medical", location="Chennai", patient_name=f"Patient {i}", patient_age=30,
+            patient_relation="Self", hospital_name="Apollo Hospitals", story_text="Story text " * 40,
+            medical_report_url=f"https://res.cloudinary.com/demo/{i}/report.pdf", hospital_report_url=None,
+            id_proof_url=None, campaign_image_url=f"https://res.cloudinary.com/demo/{i}/image.webp",
+            bank_account_number=f"{i:012d}", ifsc_code="BENC0000001", phone_number="9000000000",
+            pan_number=None, agreed_terms=True, status="approved",
+        )
+        for i in range(1, count + 1)
+    ]
+    donations = [
+        Donations(donation_id=i, user_id=i % 500 + 1, fundraiser_id=i % 1000 + 1, donor_name="Donor",
+                  amount=500.0, payment_method="UPI", donation_date=now - timedelta(minutes=i))
+        for i in range(1, count + 1)
+    ]
+    users = [
+        User(user_id=i, fullname=f"User {i}", phone_number=f"9{i:09d}", password="x" * 60, role="user")
+        for i in range(1, count + 1)
+    ]
+    return {"fundraiser": fundraisers, "donation": donations, "user": users}
+
+
+def measure(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=5, help="best of N runs is reported")
+    args = parser.parse_args()
+
+    sys.path.insert(0, ROOT)
+    os.environ.setdefault("DB_URL", "sqlite://")
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse
+    from app.core.serializers import (
+        FastJSONResponse, ORJSON_AVAILABLE, serialize_donation, serialize_fundraiser, serialize_user,
+    )
+
+    serializers = {"fundraiser": serialize_fundraiser, "donation": serialize_donation, "user": serialize_user}
+    rows = build_rows(args.rows)
+
+    print(f"{args.rows} rows per shape, best of {args.repeat} (orjson: {'yes' if ORJSON_AVAILABLE else 'no'})\n")
+    print(f"{'shape':<12} {'before rows/s':>14} {'after rows/s':>13} {'speedup':>8}")
+    for shape, objects in rows.items():
+        serialize = serializers[shape]
+        before = measure(lambda: JSONResponse(jsonable_encoder(objects)), args.repeat)
+        after = measure(lambda: FastJSONResponse([serialize(obj) for obj in objects]), args.repeat)
+        print(f"{shape:<12} {args.rows / before:>14,.0f} {args.rows / after:>13,.0f} {before / after:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Cold-start cost: time from importing app.main to the first response.
+
+Each run is a fresh interpreter, like a serverless cold start:
+
+    python benchmarks/bench_startup.py --runs 10
+    python benchmarks/bench_startup.py --runs 10 --create-all   # old behaviour
+
+--create-all runs Base.metadata.create_all before the first request, which
+is what app/main.py used to do at import time. Defaults to a throwaway
+SQLite file; pass --db-url to measure against a real server.
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_child(create_all: bool):
+    start = time.perf_counter()
+    sys.path.insert(0, ROOT)
+    from app.main import app
+    imported = time.perf_counter()
+
+    if create_all:
+        from app.database import Base, engine
+        Base.metadata.create_all(bind=engine)
+
+    import httpx
+
+    async def first_request():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            response = await client.get("/fundraiser/?limit=1")
+            response.raise_for_status()
+
+    asyncio.run(first_request())
+    done = time.perf_counter()
+    print(json.dumps({
+        "import_ms": (imported - start) * 1000,
+        "first_response_ms": (done - start) * 1000,
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db-url")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--create-all", action="store_true")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.create_all)
+        return
+
+    db_url = args.db_url
+    if not db_url:
+        # Tables must exist for the first request; create them once up front
+        db_url = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+        subprocess.run([sys.executable, os.path.join(ROOT, "scripts", "migrate.py"), "upgrade"],
+                       env=dict(os.environ, DB_URL=db_url), capture_output=True, check=True)
+
+    child_args = [sys.executable, __file__, "--child"] + (["--create-all"] if args.create_all else [])
+    env = dict(os.environ, DB_URL=db_url)
+    samples = []
+    for _ in range(args.runs):
+        wall_start = time.perf_counter()
+        proc = subprocess.run(child_args, env=env, capture_output=True, text=True)
+        if proc.returncode:
+            sys.exit(f"startup run failed:\n{proc.stderr[-4000:]}")
+        sample = json.loads(proc.stdout.strip().splitlines()[-1])
+        sample["process_ms"] = (time.perf_counter() - wall_start) * 1000
+        samples.append(sample)
+
+    for key in ("import_ms", "first_response_ms", "process_ms"):
+        values = [s[key] for s in samples]
+        print(f"{key:<18} median {statistics.median(values):8.1f}   min {min(values):8.1f}   max {max(values):8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Database migrations
+
+    python scripts/migrate.py upgrade            # apply everything pending
+    python scripts/migrate.py upgrade --to 3     # stop after version 3
+    python scripts/migrate.py status             # list applied / pending
+
+Uses DB_URL from .env unless --db-url is given (e.g. sqlite:///local.db).
+"""
+
+from dotenv import load_dotenv
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+load_dotenv()
+
+from sqlalchemy import create_engine
+
+def main():
+    parser = argparse.ArgumentParser(description="Run versioned database migrations")
+    parser.add_argument("command", choices=["upgrade", "status"])
+    parser.add_argument("--to", type=int, help="highest version to apply")
+    parser.add_argument("--db-url", default=os.getenv("DB_URL"))
+    args = parser.parse_args()
+
+    # app.database (imported by the models) builds its engine from DB_URL at import
+    os.environ["DB_URL"] = args.db_url
+    from app import migrations
+
+    engine = create_engine(args.db_url)
+    if args.command == "status":
+        for version, name, applied_at in migrations.status(engine):
+            state = f"applied {applied_at:%Y-%m-%d %H:%M}" if applied_at else "pending"
+            print(f"[{version:04d}] {name:<40} {state}")
+        return
+
+    try:
+        done = migrations.upgrade(engine, target=args.to, log=lambda msg: print(f"[..] {msg}"))
+    except Exception as e:
+        print(f"[ERROR] {e}")
+        sys.exit(1)
+    if done:
+        print(f"[SUCCESS] Applied {len(done)} migration(s): {', '.join(str(v) for v in done)}")
+    else:
+        print("[OK] Database is already up to date")
+
+if __name__ == "__main__":
+    main()
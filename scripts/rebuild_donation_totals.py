@@ -0,0 +1,37 @@
+"""
+Rebuild the fundraiser_totals / platform_totals / donation_rollups tables from raw donations
+
+Run this once after deploying the totals tables, and any time the
+running totals need to be reconciled with the donations table.
+"""
+
+from dotenv import load_dotenv
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+load_dotenv()
+
+from app.database import sessionLocal
+from app.models import user_model, fundraiser_model  # noqa: F401 - register FK targets
+from app.core.donation_totals import rebuild_totals
+from app.core.donation_rollups import rebuild_rollups
+
+def rebuild():
+    db = sessionLocal()
+    try:
+        fundraisers = rebuild_totals(db)
+        buckets = rebuild_rollups(db)
+        db.commit()
+        print(f"[SUCCESS] Rebuilt totals for {fundraisers} fundraisers")
+        print(f"[SUCCESS] Rebuilt {buckets} donation rollup rows")
+    except Exception as e:
+        print(f"[ERROR] {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    print("Rebuilding donation totals from the donations table...")
+    rebuild()
+    print("\n[DONE] Totals reconciled!")